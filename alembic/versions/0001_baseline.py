@@ -0,0 +1,104 @@
+"""Baseline schema
+
+The tables used to be created by `Base.metadata.create_all` at startup, so
+existing databases already have them. This revision only creates the tables and
+indexes that are missing, and can be applied to both new and existing databases.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Indexes per table: (name, columns, unique)
+INDEXES = {
+    "users": [("ix_users_id", ["id"], False), ("ix_users_email", ["email"], True)],
+    "contacts": [("ix_contacts_id", ["id"], False)],
+    "travels": [("ix_travels_id", ["id"], False), ("ix_travels_from_to", ["from_location", "to_location"], False)],
+    "booking": [
+        ("ix_booking_id", ["id"], False),
+        ("ix_booking_user_id", ["user_id"], False),
+        ("ix_booking_created_at", ["created_at"], False),
+    ],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if "users" not in tables:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("name", sa.String(100), nullable=False),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("password", sa.String(255), nullable=False),
+            sa.Column("mob_number", sa.String(15), nullable=False, unique=True),
+            sa.Column("role", sa.String(255), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+    if "contacts" not in tables:
+        op.create_table(
+            "contacts",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(100), nullable=False),
+            sa.Column("email", sa.String(100), nullable=False),
+            sa.Column("message", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+        )
+    if "travels" not in tables:
+        op.create_table(
+            "travels",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("image", sa.String(255), nullable=False),
+            sa.Column("from_location", sa.String(255), nullable=False),
+            sa.Column("to_location", sa.String(255), nullable=False),
+            sa.Column("time", sa.String(255), nullable=False),
+            sa.Column("seats", sa.Integer(), nullable=False),
+            sa.Column("price", sa.Float(), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+    if "booking" not in tables:
+        op.create_table(
+            "booking",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("from_location", sa.String(255), nullable=False),
+            sa.Column("to_location", sa.String(255), nullable=False),
+            sa.Column("seats", sa.Integer(), nullable=False),
+            sa.Column("price_per_seat", sa.Float(), nullable=False),
+            sa.Column("total_price", sa.Float(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+
+    # Indexes added to the models after the tables were first created are missing
+    # from older databases
+    for table, indexes in INDEXES.items():
+        existing = {index["name"] for index in inspector.get_indexes(table)} if table in tables else set()
+        for name, columns, unique in indexes:
+            if name not in existing:
+                op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("booking")
+    op.drop_table("travels")
+    op.drop_table("contacts")
+    op.drop_table("users")
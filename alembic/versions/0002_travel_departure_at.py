@@ -0,0 +1,102 @@
+"""Add travels.departure_at and backfill it from travels.time
+
+`time` is a free-form string. Values that parse as a date and time are copied
+as-is; values with only a time of day are placed on the date the travel was
+created. Values that don't parse are left NULL.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows read and updated per round trip during the backfill
+BATCH_SIZE = 1000
+
+DATETIME_FORMATS = [
+    "%Y-%m-%d %H:%M", "%Y-%m-%d %I:%M %p",
+    "%d-%m-%Y %H:%M", "%d-%m-%Y %I:%M %p",
+    "%d/%m/%Y %H:%M", "%d/%m/%Y %I:%M %p",
+]
+TIME_FORMATS = ["%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p", "%I %p", "%I%p"]
+
+
+def parse_departure(value: str, created_at: datetime | None) -> datetime | None:
+    """Best-effort conversion of a `time` string to a datetime."""
+    value = " ".join(value.split()).upper()
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=None)
+    except ValueError:
+        pass
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    if created_at is None:
+        return None
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.combine(created_at.date(), datetime.strptime(value, fmt).time())
+        except ValueError:
+            continue
+    return None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # Databases created by create_all after the model change already have the column
+    if "departure_at" not in {column["name"] for column in inspector.get_columns("travels")}:
+        op.add_column("travels", sa.Column("departure_at", sa.DateTime(), nullable=True))
+    if "ix_travels_departure_at" not in {index["name"] for index in inspector.get_indexes("travels")}:
+        op.create_index("ix_travels_departure_at", "travels", ["departure_at"])
+
+    travels = sa.table(
+        "travels",
+        sa.column("id", sa.Integer),
+        sa.column("time", sa.String),
+        sa.column("created_at", sa.DateTime),
+        sa.column("departure_at", sa.DateTime),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(travels.c.id, travels.c.time, travels.c.created_at)
+            .where(travels.c.id > last_id, travels.c.departure_at.is_(None))
+            .order_by(travels.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        updates = [
+            {"row_id": row.id, "departure_at": departure}
+            for row in rows
+            if (departure := parse_departure(row.time, row.created_at)) is not None
+        ]
+        if updates:
+            bind.execute(
+                travels.update().where(travels.c.id == sa.bindparam("row_id")),
+                updates,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_travels_departure_at", table_name="travels")
+    with op.batch_alter_table("travels") as batch_op:
+        batch_op.drop_column("departure_at")
@@ -0,0 +1,61 @@
+"""Add the change_log table behind GET /changes
+
+Existing travels and bookings are logged as "create" entries, so a client
+reading the feed from the start gets every current row.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:00:00
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Resource name logged for the rows of each table
+RESOURCES = {"travels": "travel", "booking": "booking"}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # Databases created by create_all after the model was added already have the table
+    if "change_log" in sa.inspect(bind).get_table_names():
+        return
+    change_log = op.create_table(
+        "change_log",
+        sa.Column("seq", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("resource", sa.String(20), nullable=False),
+        sa.Column("resource_id", sa.Integer(), nullable=False),
+        sa.Column("op", sa.String(10), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), nullable=False),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_change_log_resource_seq", "change_log", ["resource", "seq"])
+
+    now = datetime.utcnow()
+    for table_name, resource in RESOURCES.items():
+        table = sa.table(table_name, sa.column("id", sa.Integer))
+        bind.execute(
+            change_log.insert().from_select(
+                ["resource", "resource_id", "op", "changed_at"],
+                sa.select(
+                    sa.literal(resource), table.c.id, sa.literal("create"), sa.literal(now, sa.DateTime())
+                ).order_by(table.c.id),
+            )
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_change_log_resource_seq", table_name="change_log")
+    op.drop_table("change_log")
@@ -0,0 +1,45 @@
+"""Add booking.travel_id
+
+Links a booking to the travel its seats were reserved on, with an index for
+"bookings of a travel". Existing bookings only have the copied route and price,
+which can't tell travels on the same route apart, so they keep a NULL travel_id.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    # Databases created by create_all after the model change already have the column
+    if "travel_id" not in {column["name"] for column in inspector.get_columns("booking")}:
+        # Batch mode, so SQLite (which can't add a constraint in place) gets the foreign key too
+        with op.batch_alter_table("booking") as batch_op:
+            batch_op.add_column(sa.Column("travel_id", sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(
+                "fk_booking_travel_id", "travels", ["travel_id"], ["id"], ondelete="SET NULL"
+            )
+    if "ix_booking_travel_id" not in {index["name"] for index in inspector.get_indexes("booking")}:
+        op.create_index("ix_booking_travel_id", "booking", ["travel_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_booking_travel_id", table_name="booking")
+    with op.batch_alter_table("booking") as batch_op:
+        batch_op.drop_constraint("fk_booking_travel_id", type_="foreignkey")
+        batch_op.drop_column("travel_id")
@@ -0,0 +1,48 @@
+"""Keep microseconds in travels and booking timestamps on MySQL
+
+ETags and Last-Modified are built from updated_at, and MySQL's plain DATETIME
+rounds it to whole seconds, so two writes within a second looked unchanged.
+Other databases already keep microseconds and are left as they are.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, nullable)
+COLUMNS = [
+    ("travels", "created_at", True),
+    ("travels", "updated_at", True),
+    ("booking", "created_at", False),
+    ("booking", "updated_at", True),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "mysql":
+        return
+    for table, column, nullable in COLUMNS:
+        op.alter_column(table, column, type_=mysql.DATETIME(fsp=6),
+                        existing_type=mysql.DATETIME(), existing_nullable=nullable)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "mysql":
+        return
+    for table, column, nullable in COLUMNS:
+        op.alter_column(table, column, type_=mysql.DATETIME(),
+                        existing_type=mysql.DATETIME(fsp=6), existing_nullable=nullable)
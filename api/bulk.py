@@ -0,0 +1,145 @@
+import csv  # For parsing CSV uploads line by line
+import json  # For parsing NDJSON uploads
+
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from api.config import BULK_MAX_ERRORS
+
+# Largest batch a client may ask for
+MAX_BATCH_SIZE = 10000
+
+# Longest line accepted in an upload, so a body without line breaks can't fill memory
+MAX_LINE_BYTES = 1024 * 1024
+
+
+async def iter_lines(request: Request):
+    """
+    Yields the lines of the request body as it streams in.
+
+    Only the current chunk and one partial line are held in memory, so the
+    upload size does not matter.
+
+    :param request: Incoming request whose body is read as a stream.
+    :yield: (line_number, line) tuples, starting at 1, with the raw bytes of the
+        line without its line ending.
+    :raises HTTPException: 413 if a single line exceeds MAX_LINE_BYTES.
+    """
+    buffer = b""
+    line_number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, line.rstrip(b"\r")
+        if len(buffer) > MAX_LINE_BYTES:
+            raise HTTPException(status_code=413, detail=f"Line {line_number + 1} is longer than {MAX_LINE_BYTES} bytes")
+    if buffer:
+        yield line_number + 1, buffer.rstrip(b"\r")
+
+
+async def iter_records(request: Request):
+    """
+    Parses an NDJSON or CSV body into dictionaries, one line at a time.
+
+    CSV is used when the Content-Type is text/csv (the first line is the header,
+    empty cells are treated as missing); anything else is read as NDJSON. CSV
+    fields containing line breaks are not supported.
+
+    :param request: Incoming request.
+    :yield: (line_number, record) tuples; record is an error message string when
+        the line could not be parsed.
+    """
+    is_csv = request.headers.get("content-type", "").startswith("text/csv")
+    header = None
+    async for line_number, raw in iter_lines(request):
+        try:
+            line = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            yield line_number, "Line is not valid UTF-8"
+            continue
+        if not line.strip():
+            continue
+        if not is_csv:
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield line_number, f"Invalid JSON: {exc}"
+                continue
+            yield line_number, record if isinstance(record, dict) else "Expected a JSON object"
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield line_number, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield line_number, {name: value for name, value in zip(header, values) if value != ""}
+
+
+async def ingest(request: Request, db, schema, insert_fn, batch_size: int) -> dict:
+    """
+    Streams an upload into the database in batches.
+
+    Each record is validated against `schema` as soon as it is parsed; valid rows
+    are buffered and handed to `insert_fn` every `batch_size` rows, which inserts
+    them with a single executemany in one transaction. A batch the database
+    refuses (e.g. a row breaking a foreign key) is rolled back and retried in
+    halves, so only the offending rows are reported and the others get inserted.
+
+    :param request: Incoming request with an NDJSON or CSV body.
+    :param db: Database handle used to run `insert_fn`.
+    :param schema: Pydantic model each row must satisfy (e.g. TravelCreate).
+    :param insert_fn: CRUD function `(db, rows) -> list of (index, error)` taking a
+        list of validated models and returning the rows it rejected.
+    :param batch_size: Number of rows per transaction.
+    :return: Report with the inserted/failed counts and per-row errors.
+    """
+    report = {"inserted": 0, "failed": 0, "errors": []}
+
+    def fail(line_number, error):
+        report["failed"] += 1
+        if len(report["errors"]) < BULK_MAX_ERRORS:
+            report["errors"].append({"row": line_number, "error": error})
+
+    async def flush(batch, line_numbers):
+        try:
+            rejected = await db.run(insert_fn, batch)
+        except IntegrityError as exc:
+            # Nothing of the batch was committed (closing the session rolled it back)
+            if len(batch) == 1:
+                fail(line_numbers[0], f"Rejected by the database: {exc.orig}")
+                return
+            middle = len(batch) // 2
+            await flush(batch[:middle], line_numbers[:middle])
+            await flush(batch[middle:], line_numbers[middle:])
+            return
+        for index, error in rejected:
+            fail(line_numbers[index], error)
+        report["inserted"] += len(batch) - len(rejected)
+
+    batch, line_numbers = [], []
+    async for line_number, record in iter_records(request):
+        if isinstance(record, str):
+            fail(line_number, record)
+            continue
+        try:
+            batch.append(schema.model_validate(record))
+        except ValidationError as exc:
+            fail(line_number, "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+            ))
+            continue
+        line_numbers.append(line_number)
+        if len(batch) >= batch_size:
+            await flush(batch, line_numbers)
+            batch, line_numbers = [], []
+
+    if batch:
+        await flush(batch, line_numbers)
+    report["errors"].sort(key=lambda error: error["row"])
+    return report
@@ -0,0 +1,185 @@
+import threading  # CRUD functions run in threadpool workers, so the caches must be thread-safe
+import time
+from collections import OrderedDict
+
+from api.config import (
+    PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL, CATALOG_CACHE_SIZE, CATALOG_CACHE_MAX_BYTES, CATALOG_CACHE_TTL,
+)
+
+# Marker for "not in the cache", so None can be cached as a value
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    In-process LRU cache with an optional time-to-live per entry.
+
+    Entries are evicted least-recently-used first once `maxsize` entries (or
+    `maxbytes` bytes of values) are reached, and are treated as missing once they
+    are older than `ttl` seconds. Hit, miss and eviction counters are kept for
+    monitoring.
+
+    Every removal (`pop`, `pop_where`, `clear`) bumps `generation`. A reader that
+    captured the generation *before* querying the database passes it to `set`,
+    which then skips storing if a write invalidated the cache in between, so a
+    snapshot read before that write's commit is never cached after it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None, maxbytes: int | None = None):
+        """
+        :param maxsize: Maximum number of entries; 0 disables the cache.
+        :param ttl: Lifetime of an entry in seconds, or None to keep entries until evicted.
+        :param maxbytes: Optional bound on the total len() of the cached values (e.g. bytes).
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self.generation = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value for `key`, or `default` if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float | None = None, generation: int | None = None):
+        """
+        Stores `value` under `key`, evicting the least recently used entries if needed.
+
+        :param ttl: Lifetime of this entry in seconds, overriding the cache's default.
+        :param generation: `generation` captured before `value` was read; nothing
+            is stored if an invalidation happened since.
+        """
+        if self.maxsize <= 0:
+            return
+        if self.maxbytes is not None and len(value) > self.maxbytes:
+            return
+        ttl = ttl or self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._remove(key)
+            self._data[key] = (expires_at, value)
+            if self.maxbytes is not None:
+                self.bytes += len(value)
+            while len(self._data) > self.maxsize or (self.maxbytes is not None and self.bytes > self.maxbytes):
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def pop(self, key):
+        """
+        Removes `key` from the cache if present.
+        """
+        with self._lock:
+            self.generation += 1
+            self._remove(key)
+
+    def pop_where(self, predicate):
+        """
+        Removes every entry whose value matches `predicate` (a full scan, meant
+        for infrequent invalidations).
+        """
+        with self._lock:
+            self.generation += 1
+            for key in [key for key, (_, value) in self._data.items() if predicate(value)]:
+                self._remove(key)
+
+    def clear(self):
+        """
+        Removes every entry (the counters are kept).
+        """
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+            self.bytes = 0
+
+    def _remove(self, key):
+        # Callers hold the lock
+        entry = self._data.pop(key, _MISSING)
+        if entry is not _MISSING and self.maxbytes is not None:
+            self.bytes -= len(entry[1])
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """
+        Returns the size and hit/miss/eviction counters of the cache.
+        """
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class VersionedCache(LRUCache):
+    """
+    LRU cache whose entries are all invalidated at once by bumping a version.
+
+    Keys are stored together with the version that was current when the value
+    was read, so after `invalidate()` older entries are never served again.
+    Readers pass the version they captured *before* querying the database, so a
+    write that commits while a read is in flight cannot leave the old data cached
+    under the new version.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None, maxbytes: int | None = None):
+        super().__init__(maxsize, ttl, maxbytes)
+        self.version = 0
+
+    def get(self, key, default=None):
+        return super().get((self.version, key), default)
+
+    def set(self, key, value, *, version: int | None = None, ttl: float | None = None):
+        """
+        Stores `value` under `key` for `version` (defaults to the current version).
+        Both are keyword-only, so a `ttl` passed in `LRUCache.set`'s position
+        can't be taken for a version.
+        """
+        super().set((self.version if version is None else version, key), value, ttl)
+
+    def invalidate(self):
+        """
+        Makes every cached entry stale. Call it after the write has been committed.
+        """
+        with self._lock:
+            self.version += 1
+            # Stale entries can never be hit again, so free their memory now
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        return {**super().stats(), "version": self.version}
+
+
+# Authenticated principals (UserResponse) keyed by the token subject (the user's email).
+# Entries are dropped by update_user / delete_user (get_current_user passes the generation
+# it read under, so a lookup racing with them can't cache the old user); the TTL bounds
+# how stale another worker process can be.
+principal_cache = LRUCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+# Serialized TravelOut JSON with its validators (api.conditional.Representation) for
+# single travels and pages of /travels/get. Invalidated by the travel write functions and
+# by the seat changes of bookings; the TTL bounds how stale another worker process can be.
+catalog_cache = VersionedCache(maxsize=CATALOG_CACHE_SIZE, ttl=CATALOG_CACHE_TTL, maxbytes=CATALOG_CACHE_MAX_BYTES)
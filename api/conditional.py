@@ -0,0 +1,129 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import NamedTuple
+
+from fastapi import Request, Response
+
+
+class Validators(NamedTuple):
+    """
+    Validators of a representation: a strong ETag and the Last-Modified time.
+
+    The ETag is a hash of what identifies the content (the row's id and
+    updated_at, or the state of a page, see `page_validators`), so it can be
+    computed from a cheap query without loading or serializing the rows.
+    """
+
+    etag: str
+    last_modified: datetime | None
+
+    def headers(self) -> dict:
+        """
+        Returns the ETag and Last-Modified response headers.
+        """
+        headers = {"ETag": self.etag}
+        if self.last_modified is not None:
+            # updated_at is stored as naive UTC
+            headers["Last-Modified"] = format_datetime(self.last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+        return headers
+
+
+class Representation:
+    """
+    Serialized response body together with its validators, as kept in the
+    catalog cache. len() is the size of the body, so byte-bounded caches can
+    account for it.
+    """
+
+    __slots__ = ("body", "validators")
+
+    def __init__(self, body: bytes, validators: Validators):
+        self.body = body
+        self.validators = validators
+
+    def __len__(self):
+        return len(self.body)
+
+
+def make_etag(*parts) -> str:
+    """
+    Builds a strong ETag from the values identifying a representation.
+
+    :param parts: Values whose repr() changes whenever the representation does.
+    :return: Quoted entity tag, e.g. '"3f2a..."'.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def item_validators(kind: str, row) -> Validators:
+    """
+    Validators of a single row.
+
+    :param kind: Resource name, e.g. "travel".
+    :param row: ORM object or SQL row with `id` and `updated_at`.
+    """
+    return Validators(make_etag(kind, row.id, row.updated_at), row.updated_at)
+
+
+def page_validators(kind: str, state: tuple) -> Validators:
+    """
+    Validators of a page of rows.
+
+    :param kind: Resource name, e.g. "travels".
+    :param state: (row count, sum of ids, latest updated_at, has next page), as
+        returned by `api.pagination.page_state` or `loaded_page_state`.
+    """
+    return Validators(make_etag(kind, *state), state[2])
+
+
+def loaded_page_state(page: dict) -> tuple:
+    """
+    Computes the `api.pagination.page_state` tuple from a page returned by
+    `paginate`, so responses built from loaded rows get the same ETag as the
+    aggregate query would give.
+    """
+    items = page["items"]
+    updated = [item.updated_at for item in items if item.updated_at is not None]
+    return len(items), sum(item.id for item in items), max(updated, default=None), page["next_cursor"] is not None
+
+
+def is_conditional(request: Request) -> bool:
+    """
+    Tells whether the request carries an If-None-Match header worth checking
+    before loading the resource.
+    """
+    return "if-none-match" in request.headers
+
+
+def etag_matches(request: Request, validators: Validators) -> bool:
+    """
+    Evaluates If-None-Match against the current ETag (weak comparison, as
+    required for If-None-Match).
+    """
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return validators.etag in tags
+
+
+def not_modified(validators: Validators) -> Response:
+    """
+    Returns the 304 response for a matching conditional request.
+    """
+    return Response(status_code=304, headers=validators.headers())
+
+
+def respond(request: Request, representation: Representation, media_type: str = "application/json") -> Response:
+    """
+    Returns 304 if the request's If-None-Match matches the representation,
+    otherwise the body with its ETag and Last-Modified headers.
+    """
+    validators = representation.validators
+    if etag_matches(request, validators):
+        return not_modified(validators)
+    return Response(content=representation.body, media_type=media_type, headers=validators.headers())
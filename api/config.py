@@ -15,3 +15,105 @@ ALGORITHM = os.getenv("ALGORITHM")
 
 # Retrieve the expiration time (in minutes) for access tokens
 ACCESS_TOKEN_EXPIRE_MINUTES = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
+
+
+# Helper to read boolean flags ("1", "true", "yes", "on") from the environment
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Run the database layer on the async engine (asyncpg / aiosqlite) instead of the threadpool
+DB_ASYNC = _env_flag("DB_ASYNC")
+
+# Optional async database URL; derived from DATABASE_URL when not set
+# (e.g. 'sqlite:///./test.db' -> 'sqlite+aiosqlite:///./test.db')
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Comma-separated read replica URLs (same form as DATABASE_URL). Read-only endpoints are
+# spread over them round-robin; empty means everything runs on the primary.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+# Seconds a replica that failed a request is skipped before it gets traffic again
+REPLICA_RETRY_AFTER = float(os.getenv("REPLICA_RETRY_AFTER", "10"))
+
+# Lifetime in seconds of catalog cache entries read from a replica, which may lag behind the primary
+REPLICA_CACHE_TTL = float(os.getenv("REPLICA_CACHE_TTL", "5"))
+
+# Number of authenticated principals kept in memory by get_current_user (0 disables the cache)
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+# How long (in seconds) a cached principal is trusted before it is re-read from the database
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+
+# bcrypt work factor; stored hashes with a different cost are re-hashed on the next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Where password hashing runs off the event loop: "process" (not limited by the GIL) or "thread"
+HASH_EXECUTOR = os.getenv("HASH_EXECUTOR", "process")
+
+# Number of hashing workers, which is also the number of hashes computed at the same time
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+
+# Hashing requests allowed to wait for a worker before new ones are rejected with 503
+HASH_MAX_QUEUE = int(os.getenv("HASH_MAX_QUEUE", "256"))
+
+# Maximum number of serialized travel pages/items kept by the catalog cache (0 disables it)
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "1024"))
+
+# Upper bound (in bytes) on the JSON held by the catalog cache
+CATALOG_CACHE_MAX_BYTES = int(os.getenv("CATALOG_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Lifetime in seconds of catalog cache entries. Invalidation only reaches the worker process
+# that made the write, so this bounds how long other workers serve old seats and prices
+# (0 keeps entries until a local write)
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "5"))
+
+# Rows inserted per transaction by the bulk upload endpoints (overridable per request)
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+
+# Maximum number of per-row errors reported back by a bulk upload; further failures are only counted
+BULK_MAX_ERRORS = int(os.getenv("BULK_MAX_ERRORS", "1000"))
+
+# Serve list endpoints straight from SQL rows (no ORM objects, no response_model revalidation),
+# encoded with orjson when it is installed
+FAST_SERIALIZATION = _env_flag("FAST_SERIALIZATION")
+
+# Connections opened by the startup hook so the first requests don't pay for connecting (0 disables)
+WARM_POOL_CONNECTIONS = int(os.getenv("WARM_POOL_CONNECTIONS", "5"))
+
+# Prefill the travel catalog cache at startup
+WARM_CACHES = _env_flag("WARM_CACHES", True)
+
+# Most travel ids one /travels/stream connection may subscribe to
+STREAM_MAX_TRAVELS = int(os.getenv("STREAM_MAX_TRAVELS", "100"))
+
+# Seconds between keep-alive comments on idle /travels/stream connections
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+
+# Seconds after which a /travels/stream connection is ended (clients reconnect), so
+# connections rebalance across workers and don't block a graceful shutdown
+STREAM_MAX_SECONDS = float(os.getenv("STREAM_MAX_SECONDS", "300"))
+
+# Seconds a change log entry must be old before GET /changes returns it. Sequence numbers are
+# taken at insert time, so a transaction may commit after one holding a higher number; waiting
+# lets those commits land before a client's `since` token moves past them
+CHANGE_FEED_SETTLE_SECONDS = float(os.getenv("CHANGE_FEED_SETTLE_SECONDS", "1"))
+
+# Queue POST /contact/ messages in memory and save them in batches (202 Accepted) instead of
+# one insert and commit per request
+CONTACT_QUEUE = _env_flag("CONTACT_QUEUE")
+
+# Messages the contact queue holds before new ones are rejected with 503
+CONTACT_QUEUE_SIZE = int(os.getenv("CONTACT_QUEUE_SIZE", "10000"))
+
+# Largest batch of queued contact messages written by one multi-row INSERT
+CONTACT_BATCH_SIZE = int(os.getenv("CONTACT_BATCH_SIZE", "500"))
+
+# Seconds a queued contact message may wait for its batch to fill before it is written anyway
+CONTACT_FLUSH_SECONDS = float(os.getenv("CONTACT_FLUSH_SECONDS", "1"))
+
+# Most ids one get_many request may look up
+GET_MANY_MAX_IDS = int(os.getenv("GET_MANY_MAX_IDS", "300"))
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+
+from api.config import CONTACT_BATCH_SIZE, CONTACT_FLUSH_SECONDS, CONTACT_QUEUE_SIZE
+from api.crud.contact import bulk_create_contacts
+from api.database import connection
+from api.database.schemas.contact import ContactCreate
+
+logger = logging.getLogger(__name__)
+
+# Put on the queue by `stop`, after every message accepted before it
+_STOP = object()
+
+
+class ContactQueue:
+    """
+    Write-behind buffer for contact messages (CONTACT_QUEUE mode).
+
+    POST /contact/ only validates a message and puts it on a bounded in-memory
+    queue; one background task writes the queue out with a multi-row INSERT per
+    batch. A batch is written as soon as it holds `batch_size` messages, or
+    `flush_seconds` after its first message arrived, so a burst of thousands of
+    messages costs a few statements and one connection instead of a connection,
+    insert and commit each. When the queue is full, new messages get a 503.
+
+    Messages are only in memory until their batch is written: `stop` drains the
+    queue on a graceful shutdown, but a crashed worker loses what it held.
+    """
+
+    def __init__(self, maxsize: int, batch_size: int, flush_seconds: float):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue = None
+        self._worker = None
+        self.accepted = 0
+        self.rejected = 0  # refused with 503 because the queue was full
+        self.saved = 0
+        self.failed = 0  # lost because their batch could not be written
+        self.batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None
+
+    def start(self):
+        """
+        Starts the background writer. Call from the event loop (the lifespan hook).
+        """
+        self._queue = asyncio.Queue(self.maxsize)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stops accepting messages and waits until every queued one is written.
+        """
+        worker, self._worker = self._worker, None
+        if worker is None:
+            return
+        await self._queue.put(_STOP)
+        await worker
+
+    def submit(self, contact: ContactCreate):
+        """
+        Queues a message; it is stamped with the time it was accepted.
+
+        :raises HTTPException: 503 if the queue is full.
+        """
+        try:
+            self._queue.put_nowait({**contact.dict(), "created_at": datetime.utcnow()})
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server busy, try again", headers={"Retry-After": "1"})
+        self.accepted += 1
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            if first is _STOP:
+                return
+            batch, stopping = [first], False
+            deadline = loop.time() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        row = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, rows: list[dict]):
+        try:
+            async for db in connection.get_database():
+                await db.run(bulk_create_contacts, rows)
+        except SQLAlchemyError:
+            self.failed += len(rows)
+            logger.exception("Could not save %d queued contact messages", len(rows))
+            return
+        self.saved += len(rows)
+        self.batches += 1
+
+    def stats(self) -> dict:
+        """
+        Returns the queue depth and the accepted, rejected, saved and failed message counts.
+        """
+        return {
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "saved": self.saved,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+# Started by the lifespan hook when CONTACT_QUEUE is on, fed by POST /contact/
+contact_queue = ContactQueue(CONTACT_QUEUE_SIZE, CONTACT_BATCH_SIZE, CONTACT_FLUSH_SECONDS)
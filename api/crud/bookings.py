@@ -1,48 +1,227 @@
-from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, selectinload
 
+from api.cache import catalog_cache
+from api.conditional import item_validators, page_validators
 from api.database.models.bookings import Booking
-from api.database.schemas.bookings import BookingCreate, BookingUpdate
+from api.database.models.travels import Travel
+from api.database.schemas.bookings import BookingCreate, BookingOut, BookingUpdate
+from api.crud.changes import log_changes
+from api.crud.returning import insert_many, insert_returning, update_returning
+from api.events import travel_events
+from api.locations import location_index
+from api.pagination import DEFAULT_PAGE_SIZE, lookup, page_state, paginate
+from api.serialization import field_columns, schema_columns
 from datetime import datetime
 
+# Columns selected instead of full ORM objects by the fast serialization path
+BOOKING_OUT_COLUMNS = schema_columns(Booking, BookingOut)
+# Selected with every sparse fieldset: pagination key and ETag inputs
+BOOKING_KEY_COLUMNS = (Booking.id, Booking.updated_at)
+
+
+def booking_field_columns(fields: tuple) -> list:
+    # Columns selected for a sparse fieldset (see serialization.parse_fields)
+    return field_columns(Booking, fields, BOOKING_KEY_COLUMNS)
+
+
+
+def _take_seats(db: Session, travel_id: int, seats: int):
+    # Single conditional UPDATE: the row lock taken by it serializes concurrent
+    # bookings, and the WHERE clause makes overselling impossible.
+    # Returns None on success, otherwise (status_code, detail).
+    if seats < 1:
+        return 400, "Seats must be at least 1"
+    result = db.execute(
+        update(Travel)
+        .where(Travel.id == travel_id, Travel.seats >= seats)
+        .values(seats=Travel.seats - seats)
+    )
+    if result.rowcount == 1:
+        return None
+    if db.query(Travel.id).filter(Travel.id == travel_id).first() is None:
+        return 404, "Travel not found"
+    return 409, "Not enough seats available"
+
+
+def _give_back_seats(db: Session, travel_id: int, seats: int):
+    # Returns seats of a cancelled or reduced booking to its travel, in the same
+    # transaction (nothing to do if the travel was deleted)
+    db.execute(update(Travel).where(Travel.id == travel_id).values(seats=Travel.seats + seats))
+
+
+def _publish_seats(db: Session, travel_ids):
+    # Pushes the new seat counts to /travels/stream subscribers. Called after the
+    # commit, and only reads the travels somebody is subscribed to.
+    wanted = [travel_id for travel_id in travel_ids if travel_events.wants(travel_id)]
+    if not wanted:
+        return
+    for travel_id, seats, price in db.query(Travel.id, Travel.seats, Travel.price).filter(Travel.id.in_(wanted)):
+        travel_events.publish(travel_id, seats=seats, price=price)
+
+
+def reserve_seats(db: Session, travel_id: int, seats: int):
+    failure = _take_seats(db, travel_id, seats)
+    if failure:
+        db.rollback()
+        raise HTTPException(status_code=failure[0], detail=failure[1])
 
 
 def create_booking(db: Session, booking: BookingCreate):
-    new_booking = Booking(
+    # Seats are taken in the same transaction as the booking insert
+    if booking.travel_id is not None:
+        reserve_seats(db, booking.travel_id, booking.seats)
+    def log(obj):
+        log_changes(db, "booking", "create", [obj.id])
+        if booking.travel_id is not None:
+            log_changes(db, "travel", "update", [booking.travel_id])
+
+    new_booking = insert_returning(db, Booking, {
         **booking.dict(),
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
-    )
-    db.add(new_booking)
-    db.commit()
-    db.refresh(new_booking)
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }, log)
+    if booking.travel_id is not None:
+        catalog_cache.invalidate()  # the travel's seat count changed
+        _publish_seats(db, [booking.travel_id])
+    location_index.record_bookings(new_booking.from_location, new_booking.to_location)
     return new_booking
 
-def get_bookings(db: Session):
-    return db.query(Booking).all()
+def bulk_create_bookings(db: Session, bookings: list[BookingCreate]):
+    # Rows with a travel_id reserve their seats first; rows that can't are rejected
+    # and the rest of the batch is inserted with one executemany in the same transaction.
+    rejected, rows = [], []
+    reserved = set()  # travels whose seats were taken
+    now = datetime.utcnow()
+    for index, booking in enumerate(bookings):
+        if booking.travel_id is not None:
+            failure = _take_seats(db, booking.travel_id, booking.seats)
+            if failure:
+                rejected.append((index, failure[1]))
+                continue
+            reserved.add(booking.travel_id)
+        rows.append({**booking.dict(), "created_at": now, "updated_at": now})
+    if rows:
+        log_changes(db, "booking", "create", insert_many(db, Booking, rows))
+    log_changes(db, "travel", "update", sorted(reserved))
+    db.commit()
+    if reserved:
+        catalog_cache.invalidate()
+        _publish_seats(db, reserved)
+    for row in rows:
+        location_index.record_bookings(row["from_location"], row["to_location"])
+    return rejected
+
+def get_bookings(db: Session, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None, columns: list | None = None):
+    # With `columns`, plain rows are returned instead of Booking objects
+    query = db.query(*columns) if columns else db.query(Booking)
+    return paginate(query, [Booking.id], limit, cursor)
+
+def get_bookings_validators(db: Session, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None):
+    # ETag / Last-Modified of a /bookings/get page from one aggregate query (no rows loaded)
+    state = page_state(db.query(Booking), [Booking.id], limit, cursor, Booking.id, Booking.updated_at)
+    return page_validators("bookings", state)
+
+def get_booking(db: Session, booking_id: int, columns: list | None = None):
+    query = db.query(*columns) if columns else db.query(Booking)
+    return query.filter(Booking.id == booking_id).first()
 
-def get_booking(db: Session, booking_id: int):
-    return db.query(Booking).filter(Booking.id == booking_id).first()
+def get_bookings_by_ids(db: Session, booking_ids: list[int], columns: list | None = None):
+    # Bookings keyed by id plus the missing ids, from one IN query (see pagination.lookup)
+    query = db.query(*columns) if columns else db.query(Booking)
+    return lookup(query, Booking.id, booking_ids)
+
+def get_booking_validators(db: Session, booking_id: int):
+    # ETag / Last-Modified of a booking without loading it; None if it doesn't exist
+    row = db.query(Booking.id, Booking.updated_at).filter(Booking.id == booking_id).first()
+    return item_validators("booking", row) if row else None
 def update_booking(db: Session, booking_id: int, updated: BookingUpdate):
-    db_booking = get_booking(db, booking_id)
+    values = {**updated.dict(exclude_unset=True), "updated_at": datetime.utcnow()}
+    # The old row is read and locked first: its locations keep the location index
+    # right, and its seats give the difference to take from or return to the travel
+    old = (
+        db.query(Booking.from_location, Booking.to_location, Booking.seats, Booking.travel_id)
+        .filter(Booking.id == booking_id)
+        .with_for_update()
+        .first()
+    )
+    if old is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    delta = 0
+    if old.travel_id is not None and "seats" in values:
+        if values["seats"] < 1:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Seats must be at least 1")
+        delta = values["seats"] - old.seats
+        # Extra seats go through the same conditional UPDATE as a new booking (409 if they're gone)
+        if delta > 0:
+            reserve_seats(db, old.travel_id, delta)
+        elif delta < 0:
+            _give_back_seats(db, old.travel_id, -delta)
+
+    def log(obj):
+        log_changes(db, "booking", "update", [obj.id])
+        if delta:
+            log_changes(db, "travel", "update", [old.travel_id])
+
+    db_booking = update_returning(db, Booking, booking_id, values, log)
     if not db_booking:
         raise HTTPException(status_code=404, detail="Booking not found")
-    
-    for key, value in updated.dict(exclude_unset=True).items():
-        setattr(db_booking, key, value)
-    
-    db_booking.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(db_booking)
+    if delta:
+        catalog_cache.invalidate()  # the travel's seat count changed
+        _publish_seats(db, [old.travel_id])
+    if "from_location" in values or "to_location" in values:
+        location_index.record_bookings(old.from_location, old.to_location, -1)
+        location_index.record_bookings(db_booking.from_location, db_booking.to_location)
     return db_booking
 
     
 def delete_booking(db: Session, booking_id: int):
-    db_booking = get_booking(db, booking_id)
+    # Locked, so two concurrent deletes of the booking can't both return its seats
+    db_booking = db.query(Booking).filter(Booking.id == booking_id).with_for_update().first()
     if db_booking:
+        travel_id = db_booking.travel_id
         db.delete(db_booking)
+        log_changes(db, "booking", "delete", [db_booking.id])
+        # The booked seats go back to the travel in the same transaction
+        if travel_id is not None:
+            _give_back_seats(db, travel_id, db_booking.seats)
+            log_changes(db, "travel", "update", [travel_id])
         db.commit()
+        if travel_id is not None:
+            catalog_cache.invalidate()
+            _publish_seats(db, [travel_id])
+        location_index.record_bookings(db_booking.from_location, db_booking.to_location, -1)
     return db_booking
 
 
-def get_bookings_by_user(db: Session, user_id: int):
-    return db.query(Booking).filter(Booking.user_id == user_id).all()
+def iter_booking_rows(db: Session, user_id: int | None = None, created_from: datetime | None = None,
+                      created_to: datetime | None = None, batch_size: int = 1000):
+    # Streams plain rows (no ORM objects) through a server-side cursor, batch_size
+    # rows at a time, so memory does not grow with the number of bookings.
+    query = select(*Booking.__table__.columns).order_by(Booking.id)
+    if user_id is not None:
+        query = query.where(Booking.user_id == user_id)
+    if created_from is not None:
+        query = query.where(Booking.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(Booking.created_at < created_to)
+    result = db.execute(query.execution_options(yield_per=batch_size))
+    yield from result.partitions()
+
+
+def get_bookings_by_user(db: Session, user_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None,
+                         columns: list | None = None, expand_travel: bool = False):
+    # With `expand_travel`, the travels of the page are loaded by a single extra
+    # SELECT ... WHERE id IN (...), however many bookings the page holds
+    query = db.query(*columns) if columns else db.query(Booking)
+    if expand_travel:
+        query = query.options(selectinload(Booking.travel))
+    query = query.filter(Booking.user_id == user_id)
+    return paginate(query, [Booking.id], limit, cursor)
+
+def get_bookings_by_user_validators(db: Session, user_id: int, limit: int = DEFAULT_PAGE_SIZE,
+                                    cursor: str | None = None):
+    query = db.query(Booking).filter(Booking.user_id == user_id)
+    return page_validators("bookings", page_state(query, [Booking.id], limit, cursor, Booking.id, Booking.updated_at))
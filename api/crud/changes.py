@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from api.config import CHANGE_FEED_SETTLE_SECONDS
+from api.database.models.bookings import Booking
+from api.database.models.changes import Change
+from api.database.models.travels import Travel
+from api.database.schemas.bookings import BookingOut
+from api.database.schemas.travels import TravelOut
+from api.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor
+
+# Model and response schema of each resource in the change log
+RESOURCES = {"travel": (Travel, TravelOut), "booking": (Booking, BookingOut)}
+
+
+def log_changes(db: Session, resource: str, op: str, ids):
+    # Appends change log entries for the given rows. Call before the commit of
+    # the write they describe, so both land in the same transaction.
+    now = datetime.utcnow()
+    entries = [{"resource": resource, "resource_id": row_id, "op": op, "changed_at": now} for row_id in ids]
+    if entries:
+        db.execute(insert(Change), entries)
+
+
+def get_changes(db: Session, since: str | None = None, limit: int = DEFAULT_PAGE_SIZE, resource: str | None = None):
+    # Reads up to `limit` log entries after the `since` token and returns the
+    # current state of the rows they name. Several entries of one row collapse
+    # into the latest, and a row that no longer exists becomes a delete
+    # (tombstone), so a sync costs one IN query per resource on top of the log
+    # range scan, whatever the table sizes.
+    after = decode_cursor(since, [Change.seq])[0] if since else 0
+    cutoff = datetime.utcnow() - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+    query = db.query(Change.seq, Change.resource, Change.resource_id, Change.op).filter(
+        Change.seq > after, Change.changed_at <= cutoff
+    )
+    if resource is not None:
+        query = query.filter(Change.resource == resource)
+    entries = query.order_by(Change.seq).limit(limit + 1).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    latest = {}  # (resource, id) -> latest entry, ordered by its seq
+    for entry in entries:
+        key = (entry.resource, entry.resource_id)
+        latest.pop(key, None)
+        latest[key] = entry
+    rows = {}
+    for name, (model, _) in RESOURCES.items():
+        ids = [row_id for entry_resource, row_id in latest if entry_resource == name]
+        if ids:
+            rows[name] = {row.id: row for row in db.query(model).filter(model.id.in_(ids))}
+
+    changes = []
+    for (name, row_id), entry in latest.items():
+        row = rows.get(name, {}).get(row_id)
+        change = {"seq": entry.seq, "resource": name, "id": row_id}
+        if row is None:
+            changes.append({**change, "op": "delete", "data": None})
+        else:
+            # A delete followed by a row with the same id (SQLite reuses the highest id)
+            # is a new row for the client
+            op = "create" if entry.op == "delete" else entry.op
+            changes.append({**change, "op": op, "data": RESOURCES[name][1].model_validate(row)})
+    # With nothing new, the client keeps its position
+    next_token = encode_cursor([entries[-1].seq]) if entries else since or encode_cursor([after])
+    return {"changes": changes, "next": next_token, "has_more": has_more}
@@ -1,10 +1,13 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from api.database.models.contact import Contact
 from api.database.schemas.contact import ContactCreate
+from api.crud.returning import insert_returning
 
 def create_contact(db: Session, contact_data: ContactCreate):
-    contact = Contact(**contact_data.dict())
-    db.add(contact)
+    return insert_returning(db, Contact, contact_data.dict())
+
+def bulk_create_contacts(db: Session, rows: list[dict]):
+    # One multi-row INSERT ... VALUES statement and one commit for the whole batch
+    db.execute(insert(Contact).values(rows))
     db.commit()
-    db.refresh(contact)
-    return contact
@@ -0,0 +1,114 @@
+from typing import Callable
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+
+def supports_returning(db: Session, statement: str) -> bool:
+    """
+    Checks whether the session's backend supports INSERT/UPDATE ... RETURNING
+    (SQLite >= 3.35, PostgreSQL, MariaDB for INSERT; not MySQL).
+
+    :param db: Database session.
+    :param statement: "insert" or "update".
+    """
+    dialect = db.get_bind().dialect
+    return dialect.insert_returning if statement == "insert" else dialect.update_returning
+
+
+def insert_returning(db: Session, model, values: dict, before_commit: Callable | None = None):
+    """
+    Inserts a row and commits, returning the new object fully loaded.
+
+    Uses a single INSERT ... RETURNING when the backend supports it, so defaults
+    and the primary key come back without the extra SELECT of `db.refresh`.
+    Otherwise falls back to add / flush / commit / refresh.
+
+    :param db: Database session.
+    :param model: SQLAlchemy model class.
+    :param values: Column values for the new row.
+    :param before_commit: Called with the new object (its id set) before the
+        commit, to write more rows in the same transaction.
+    :return: The new model instance.
+    """
+    if not supports_returning(db, "insert"):
+        obj = model(**values)
+        db.add(obj)
+        if before_commit:
+            db.flush()
+            before_commit(obj)
+        db.commit()
+        db.refresh(obj)
+        return obj
+
+    obj = db.scalars(insert(model).returning(model), [values]).one()
+    # Detach before committing so the commit doesn't expire the returned state
+    db.expunge(obj)
+    if before_commit:
+        before_commit(obj)
+    db.commit()
+    return obj
+
+
+def insert_many(db: Session, model, rows: list[dict]) -> list[int]:
+    """
+    Inserts rows without committing and returns their primary keys, in order.
+
+    Uses one executemany INSERT ... RETURNING when the backend supports it
+    (batched into multi-row statements by SQLAlchemy); otherwise the rows are
+    flushed through the ORM to learn their ids.
+
+    :param db: Database session.
+    :param model: SQLAlchemy model class.
+    :param rows: Column values of each new row.
+    :return: Ids of the new rows.
+    """
+    if db.get_bind().dialect.insert_executemany_returning:
+        return list(db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows))
+    objects = [model(**row) for row in rows]
+    db.add_all(objects)
+    db.flush()
+    return [obj.id for obj in objects]
+
+
+def update_returning(db: Session, model, row_id: int, values: dict, before_commit: Callable | None = None):
+    """
+    Updates a row by primary key and commits, returning the updated object.
+
+    Uses a single UPDATE ... RETURNING when the backend supports it; otherwise
+    falls back to SELECT / commit / refresh.
+
+    :param db: Database session.
+    :param model: SQLAlchemy model class.
+    :param row_id: Primary key of the row.
+    :param values: Columns to change.
+    :param before_commit: Called with the updated object before the commit (not
+        called when the row doesn't exist).
+    :return: The updated model instance, or None if no row has that id.
+    """
+    if not supports_returning(db, "update") or not values:
+        obj = db.get(model, row_id)
+        if obj is None:
+            return None
+        for key, value in values.items():
+            setattr(obj, key, value)
+        if before_commit:
+            db.flush()
+            before_commit(obj)
+        db.commit()
+        db.refresh(obj)
+        return obj
+
+    obj = db.scalars(
+        update(model)
+        .where(model.id == row_id)
+        .values(**values)
+        .returning(model)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if obj is not None:
+        db.expunge(obj)
+        if before_commit:
+            before_commit(obj)
+    db.commit()
+    return obj
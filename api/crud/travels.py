@@ -1,36 +1,208 @@
+from datetime import datetime
+
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+from api.cache import catalog_cache
+from api.conditional import Representation, item_validators, loaded_page_state, page_validators
+from api.config import FAST_SERIALIZATION, REPLICA_CACHE_TTL
+from api.database.connection import uses_replica
+from api.database.models.bookings import Booking
 from api.database.models.travels import Travel
-from api.database.schemas.travels import TravelCreate, TravelUpdate
+from api.database.schemas.pagination import Page
+from api.database.schemas.travels import TravelCreate, TravelOut, TravelUpdate
+from api.crud.changes import log_changes
+from api.crud.returning import insert_many, insert_returning, update_returning
+from api.events import travel_events
+from api.locations import location_index
+from api.pagination import DEFAULT_PAGE_SIZE, lookup, page_state, paginate
+from api.serialization import (
+    dumps, field_columns, page_content, schema_columns, sparse_item_json, sparse_page_json,
+)
+
+# Columns selected instead of full ORM objects by the fast serialization path
+TRAVEL_OUT_COLUMNS = schema_columns(Travel, TravelOut)
+# Selected with every sparse fieldset: pagination keys and ETag inputs
+TRAVEL_KEY_COLUMNS = (Travel.id, Travel.departure_at, Travel.updated_at)
+
 
+def travel_field_columns(fields: tuple) -> list:
+    # Columns selected for a sparse fieldset (see serialization.parse_fields)
+    return field_columns(Travel, fields, TRAVEL_KEY_COLUMNS)
+
+
+def _travel_row(travel: TravelCreate, now: datetime) -> dict:
+    # created_at / updated_at are set by the server: the ETags are built from
+    # updated_at, so a client-chosen value could make two versions look alike
+    return {**travel.dict(), "created_at": now, "updated_at": now}
 
 def create_travel(db: Session, travel: TravelCreate):
-    new_travel = Travel(**travel.dict())
-    db.add(new_travel)
-    db.commit()
-    db.refresh(new_travel)
+    new_travel = insert_returning(db, Travel, _travel_row(travel, datetime.utcnow()),
+                                  lambda obj: log_changes(db, "travel", "create", [obj.id]))
+    catalog_cache.invalidate()
+    location_index.add_travel(new_travel.from_location, new_travel.to_location)
     return new_travel
 
-def get_travels(db: Session):
-    return db.query(Travel).all()
+def bulk_create_travels(db: Session, travels: list[TravelCreate]):
+    # One executemany INSERT and one commit for the whole batch
+    now = datetime.utcnow()
+    ids = insert_many(db, Travel, [_travel_row(travel, now) for travel in travels])
+    log_changes(db, "travel", "create", ids)
+    db.commit()
+    catalog_cache.invalidate()
+    for travel in travels:
+        location_index.add_travel(travel.from_location, travel.to_location)
+    return []  # no per-row rejections
+
+def _travels_query(db: Session, columns: list | None, departs_after: datetime | None,
+                   departs_before: datetime | None, order_by: str):
+    # Returns the filtered query and its ordering columns, shared by get_travels
+    # and get_travels_validators so both describe the same page.
+    # With `columns`, plain rows are returned instead of Travel objects
+    query = db.query(*columns) if columns else db.query(Travel)
+    # The departure window (after inclusive, before exclusive) and the departure
+    # ordering are both range scans on the departure_at index
+    if departs_after is not None:
+        query = query.filter(Travel.departure_at >= departs_after)
+    if departs_before is not None:
+        query = query.filter(Travel.departure_at < departs_before)
+    if order_by == "departure_at":
+        # Travels without a departure time can't be placed in that order
+        query = query.filter(Travel.departure_at.isnot(None))
+        return query, [Travel.departure_at, Travel.id]
+    return query, [Travel.id]
+
+def get_travels(db: Session, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None, columns: list | None = None,
+                departs_after: datetime | None = None, departs_before: datetime | None = None, order_by: str = "id"):
+    query, order_columns = _travels_query(db, columns, departs_after, departs_before, order_by)
+    return paginate(query, order_columns, limit, cursor)
+
+def get_travels_validators(db: Session, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None,
+                           departs_after: datetime | None = None, departs_before: datetime | None = None,
+                           order_by: str = "id"):
+    # ETag / Last-Modified of a /travels/get page from one aggregate query (no rows loaded)
+    query, order_columns = _travels_query(db, None, departs_after, departs_before, order_by)
+    return page_validators("travels", page_state(query, order_columns, limit, cursor, Travel.id, Travel.updated_at))
+
+def search_travels(db: Session, from_location: str | None = None, to_location: str | None = None,
+                   limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None, columns: list | None = None):
+    # Exact matches on the locations, served by the (from_location, to_location) index
+    query = db.query(*columns) if columns else db.query(Travel)
+    if from_location is not None:
+        query = query.filter(Travel.from_location == from_location)
+    if to_location is not None:
+        query = query.filter(Travel.to_location == to_location)
+    return paginate(query, [Travel.id], limit, cursor)
 
 def get_travel(db: Session, travel_id: int):
     return db.query(Travel).filter(Travel.id == travel_id).first()
 
+def get_travels_by_ids(db: Session, travel_ids: list[int], columns: list | None = None):
+    # Travels keyed by id plus the missing ids, from one IN query (see pagination.lookup)
+    query = db.query(*columns) if columns else db.query(Travel)
+    return lookup(query, Travel.id, travel_ids)
+
+def get_seats(db: Session, travel_ids):
+    # Current seats and price of the given travels, for the /travels/stream snapshot
+    rows = db.query(Travel.id, Travel.seats, Travel.price).filter(Travel.id.in_(travel_ids)).order_by(Travel.id)
+    return [row._asdict() for row in rows]
+
+def get_travel_validators(db: Session, travel_id: int):
+    # ETag / Last-Modified of a travel without loading it; None if it doesn't exist
+    row = db.query(Travel.id, Travel.updated_at).filter(Travel.id == travel_id).first()
+    return item_validators("travel", row) if row else None
+
     
 def update_travel(db: Session, travel_id: int, updated: TravelUpdate):
-    db_travel = get_travel(db, travel_id)
+    update_data = updated.dict(exclude_unset=True)  # only include provided fields
+    # The old locations are only needed (and read) when a location changes
+    old = None
+    if "from_location" in update_data or "to_location" in update_data:
+        old = db.query(Travel.from_location, Travel.to_location).filter(Travel.id == travel_id).first()
+    db_travel = update_returning(db, Travel, travel_id, update_data,
+                                 lambda obj: log_changes(db, "travel", "update", [obj.id]))
     if db_travel:
-        update_data = updated.dict(exclude_unset=True)  # only include provided fields
-        for key, value in update_data.items():
-            setattr(db_travel, key, value)
-        db.commit()
-        db.refresh(db_travel)
+        catalog_cache.invalidate()
+        if old:
+            location_index.remove_travel(old.from_location, old.to_location)
+            location_index.add_travel(db_travel.from_location, db_travel.to_location)
+        if "seats" in update_data or "price" in update_data:
+            travel_events.publish(db_travel.id, seats=db_travel.seats, price=db_travel.price)
     return db_travel
 
 
+def _unlink_bookings(db: Session, travel_id: int):
+    # Clears travel_id on the travel's bookings in the delete's transaction, instead
+    # of relying on ON DELETE SET NULL: SQLite doesn't enforce it without
+    # PRAGMA foreign_keys (a reused id would then adopt the bookings), and where
+    # it is enforced it leaves updated_at and the change log untouched
+    ids = [row.id for row in db.query(Booking.id).filter(Booking.travel_id == travel_id).with_for_update()]
+    if ids:
+        db.execute(update(Booking).where(Booking.id.in_(ids)).values(travel_id=None, updated_at=datetime.utcnow()))
+        log_changes(db, "booking", "update", ids)
+
 def delete_travel(db: Session, travel_id: int):
     db_travel = get_travel(db, travel_id)
     if db_travel:
+        _unlink_bookings(db, travel_id)
         db.delete(db_travel)
+        log_changes(db, "travel", "delete", [db_travel.id])
         db.commit()
+        catalog_cache.invalidate()
+        location_index.remove_travel(db_travel.from_location, db_travel.to_location)
+        travel_events.publish(db_travel.id, deleted=True)
     return db_travel
+
+
+# ----- Catalog cache -----
+# Read-through cache of serialized TravelOut JSON (with its ETag and Last-Modified),
+# so a hit skips both the SQL and Pydantic. The routes check the cache first and
+# only run the *_json functions below (which need a session) on a miss.
+
+def _cache_ttl(db: Session):
+    # Invalidation only tracks writes made by this process; a replica may still
+    # return older rows afterwards, so what was read from one gets its own TTL.
+    # None means the cache's CATALOG_CACHE_TTL
+    return REPLICA_CACHE_TTL if uses_replica(db) else None
+
+def cached_travels_json(limit: int, cursor: str | None, departs_after: datetime | None = None,
+                        departs_before: datetime | None = None, order_by: str = "id", fields: tuple | None = None):
+    return catalog_cache.get(("page", limit, cursor, departs_after, departs_before, order_by, fields))
+
+def get_travels_json(db: Session, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None,
+                     departs_after: datetime | None = None, departs_before: datetime | None = None,
+                     order_by: str = "id", fields: tuple | None = None):
+    # `fields` (from serialization.parse_fields) selects and returns only those columns
+    version = catalog_cache.version  # captured before reading, see VersionedCache
+    filters = {"departs_after": departs_after, "departs_before": departs_before, "order_by": order_by}
+    if fields:
+        page = get_travels(db, limit, cursor, travel_field_columns(fields), **filters)
+        body = sparse_page_json(page, TravelOut, fields)
+    elif FAST_SERIALIZATION:
+        page = get_travels(db, limit, cursor, TRAVEL_OUT_COLUMNS, **filters)
+        body = dumps(page_content(page))
+    else:
+        page = get_travels(db, limit, cursor, **filters)
+        body = Page[TravelOut].model_validate(page).model_dump_json().encode()
+    representation = Representation(body, page_validators("travels", loaded_page_state(page)))
+    catalog_cache.set(("page", limit, cursor, departs_after, departs_before, order_by, fields), representation,
+                      version=version, ttl=_cache_ttl(db))
+    return representation
+
+def cached_travel_json(travel_id: int, fields: tuple | None = None):
+    return catalog_cache.get(("travel", travel_id, fields))
+
+def get_travel_json(db: Session, travel_id: int, fields: tuple | None = None):
+    version = catalog_cache.version
+    if fields:
+        db_travel = db.query(*travel_field_columns(fields)).filter(Travel.id == travel_id).first()
+    else:
+        db_travel = get_travel(db, travel_id)
+    if db_travel is None:
+        return None
+    if fields:
+        body = sparse_item_json(db_travel, TravelOut, fields)
+    else:
+        body = TravelOut.model_validate(db_travel).model_dump_json().encode()
+    representation = Representation(body, item_validators("travel", db_travel))
+    catalog_cache.set(("travel", travel_id, fields), representation, version=version, ttl=_cache_ttl(db))
+    return representation
@@ -1,43 +1,96 @@
 # Importing necessary modules
+from fastapi import HTTPException
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from api.database.models.user import User  # Importing the User model
-from api.database.schemas.user import UserCreate, UserUpdate  # Importing schemas for user data validation
+from api.database.schemas.user import UserCreate, UserResponse, UserUpdate  # Importing schemas for user data validation
 from datetime import datetime  # For handling timestamps
 from api.security import hash_password  # For hashing passwords before storing
+from api.pagination import DEFAULT_PAGE_SIZE, lookup, paginate  # For keyset pagination and id lookups of user lists
+from api.cache import principal_cache  # Cached principals must be dropped when a user changes
+from api.serialization import field_columns, schema_columns  # For selecting only the columns a response needs
+from api.crud.returning import insert_returning, update_returning  # Single-statement writes
+
+# Columns selected instead of full User objects when listing users (no password hash)
+USER_RESPONSE_COLUMNS = schema_columns(User, UserResponse)
+
+
+# Function to pick the columns of a sparse fieldset
+def user_field_columns(fields: tuple) -> list:
+    """
+    Returns the columns to select for a sparse fieldset of UserResponse.
+
+    :param fields: Field names returned by serialization.parse_fields.
+    :return: The fields' columns plus User.id, the pagination key.
+    """
+    return field_columns(User, fields, (User.id,))
 
 # Function to create a new user in the database
-def create_user(db: Session, user: UserCreate):
+def create_user(db: Session, user: UserCreate, hashed_password: str | None = None):
     """
     Creates a new user with hashed password and stores it in the database.
     
     :param db: Database session.
     :param user: User data from the request.
+    :param hashed_password: Hash of user.password computed by the caller (e.g. on the
+        hashing executor). When None, the password is hashed here.
     :return: The newly created user object.
+    :raises HTTPException: 400 if the email or mobile number is already registered.
     """
-    # Create a new User instance with data from the request
-    db_user = User(
-        name=user.name,  # User's full name
-        email=user.email,  # User's email
-        password=hash_password(user.password),  # Hash the password before storing
-        mob_number=user.mob_number,  # User's mobile number
-        role="customer",  # Default role for a new user is 'customer'
-        created_at=datetime.utcnow(),  # Timestamp of user creation (current time in UTC)
-        updated_at=None  # No update timestamp initially
-    )
-    
-    # Add the new user to the database session
-    db.add(db_user)
-    
-    # Commit the transaction to save changes to the database
-    db.commit()
-    
-    # Refresh the user instance to retrieve the latest data from the database
-    db.refresh(db_user)
+    # Insert the new user and get it back in one statement (INSERT ... RETURNING where supported).
+    # Duplicates are caught by the unique constraints on email and mob_number, which
+    # also covers two registrations racing each other.
+    try:
+        db_user = insert_returning(db, User, {
+            "name": user.name,  # User's full name
+            "email": user.email,  # User's email
+            "password": hashed_password or hash_password(user.password),  # Hash the password before storing
+            "mob_number": user.mob_number,  # User's mobile number
+            "role": "customer",  # Default role for a new user is 'customer'
+            "created_at": datetime.utcnow(),  # Timestamp of user creation (current time in UTC)
+            "updated_at": None  # No update timestamp initially
+        })
+    except IntegrityError as exc:
+        db.rollback()
+        # The constraint name / column is in the driver's message on SQLite, PostgreSQL and MySQL
+        message = str(exc.orig)
+        if "mob_number" in message:
+            detail = "Mobile number already registered"
+        elif "email" in message:
+            detail = "Email already registered"
+        else:
+            detail = find_registration_conflict(db, user.email, user.mob_number) or "User already registered"
+        raise HTTPException(status_code=400, detail=detail)
     
     # Return the newly created user object
     return db_user
 
 
+# Function to check in one query whether an email or mobile number is taken
+def find_registration_conflict(db: Session, email: str, mob_number: str):
+    """
+    Checks whether a new user's email or mobile number is already registered.
+    This is a cheap indexed lookup, used before spending CPU on bcrypt.
+    
+    :param db: Database session.
+    :param email: Email of the new user.
+    :param mob_number: Mobile number of the new user.
+    :return: The error message to return to the client, or None if both are free.
+    """
+    # One query over both unique columns, reading only those two columns
+    taken = db.query(User.email, User.mob_number).filter(
+        or_(User.email == email, User.mob_number == mob_number)
+    ).limit(2).all()
+    
+    # Report the email first, like the separate checks used to
+    if any(row.email == email for row in taken):
+        return "Email already registered"
+    if taken:
+        return "Mobile number already registered"
+    return None
+
+
 # Function to retrieve a user by email
 def get_user_by_email(db: Session, email: str):
     """
@@ -77,60 +130,91 @@ def get_user_by_id(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
 
 
-# Function to retrieve all users or a specific user by ID
-def get_users(db: Session, user_id: int | None = None):
+# Function to retrieve a page of users or a specific user by ID
+def get_users(db: Session, user_id: int | None = None, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None,
+              columns: list | None = None):
     """
-    Fetches all users or a specific user by their ID.
+    Fetches a page of users or a specific user by their ID.
     
     :param db: Database session.
-    :param user_id: Optional user ID to fetch a single user. If None, fetches all users.
-    :return: List of users or a single user object if user_id is provided.
+    :param user_id: Optional user ID to fetch a single user. If None, fetches a page of users.
+    :param limit: Maximum number of users in the page.
+    :param cursor: Cursor returned with the previous page, or None for the first page.
+    :param columns: Optional columns to select; plain rows are returned instead of User objects.
+    :return: Page dictionary (items, next_cursor), or a single user object if user_id is provided.
     """
+    query = db.query(*columns) if columns else db.query(User)
     if user_id:
         # Query for a user with the given ID
-        return db.query(User).filter(User.id == user_id).first()
+        return query.filter(User.id == user_id).first()
     
-    # Query for all users if no user_id is provided
-    return db.query(User).all()
+    # Query for the next page of users, ordered by ID
+    return paginate(query, [User.id], limit, cursor)
+
+
+# Function to retrieve several users by ID at once
+def get_users_by_ids(db: Session, user_ids: list[int], columns: list):
+    """
+    Fetches the users with the given IDs in a single query.
+
+    :param db: Database session.
+    :param user_ids: User IDs to fetch (at most GET_MANY_MAX_IDS).
+    :param columns: Columns to select (USER_RESPONSE_COLUMNS or a sparse fieldset); must include User.id.
+    :return: Dictionary with the found users keyed by ID (`items`) and the `missing` IDs.
+    """
+    return lookup(db.query(*columns), User.id, user_ids)
 
 
 # Function to update an existing user
-def update_user(db: Session, user_id: int, user: UserUpdate):
+def update_user(db: Session, user_id: int, user: UserUpdate, hashed_password: str | None = None):
     """
     Updates an existing user with new data.
     
     :param db: Database session.
     :param user_id: User's unique identifier.
     :param user: User data to update.
+    :param hashed_password: Hash of user.password computed by the caller, if any.
+        When None and a password is given, it is hashed here.
     :return: Updated user object if successful, else None.
     """
-    # Fetch the user from the database by their ID
-    db_user = db.query(User).filter(User.id == user_id).first()
+    # Collect the fields of the UserUpdate object that were provided
+    values = user.dict(exclude_unset=True)
+    if "password" in values:
+        # If the field is 'password', hash the new value before storing it
+        values["password"] = hashed_password or hash_password(values["password"])
+    
+    # Set the updated timestamp to the current time in UTC
+    values["updated_at"] = datetime.utcnow()
+    
+    # Update and read back the user in one statement (UPDATE ... RETURNING where supported)
+    db_user = update_returning(db, User, user_id, values)
     
     # If the user doesn't exist, return None
     if not db_user:
         return None
-
-    # Iterate over the fields of the UserUpdate object and update the corresponding user data
-    for key, value in user.dict(exclude_unset=True).items():
-        if key == "password":
-            # If the field is 'password', hash the new value before storing it
-            value = hash_password(value)
-        setattr(db_user, key, value)  # Set the new value on the user object
     
-    # Set the updated timestamp to the current time in UTC
-    db_user.updated_at = datetime.utcnow()
-    
-    # Commit the changes to the database
-    db.commit()
-    
-    # Refresh the user instance with the latest data from the database
-    db.refresh(db_user)
+    # Drop the cached principal (after the commit, so it can't be re-cached stale).
+    # It is looked up by id because the email it is cached under may just have changed.
+    principal_cache.pop_where(lambda principal: principal.id == user_id)
     
     # Return the updated user object
     return db_user
 
 
+# Function to replace a user's stored password hash
+def update_password_hash(db: Session, user_id: int, hashed_password: str):
+    """
+    Stores a new hash for the user's existing password (used to re-hash on login
+    when the bcrypt cost changes). The update timestamp is left untouched.
+    
+    :param db: Database session.
+    :param user_id: User's unique identifier.
+    :param hashed_password: The new password hash.
+    """
+    db.query(User).filter(User.id == user_id).update({User.password: hashed_password})
+    db.commit()
+
+
 # Function to delete a user from the database
 def delete_user(db: Session, user_id: int):
     """
@@ -147,4 +231,5 @@ def delete_user(db: Session, user_id: int):
     if db_user:
         db.delete(db_user)
         db.commit()  # Commit the transaction to remove the user
+        principal_cache.pop(db_user.email)  # Tokens for this user must stop authenticating
     return db_user  # Return the deleted user object (or None if not found)
@@ -1,2 +1,2 @@
 from api.database.connection import Base
-from api.database.models import user
+from api.database.models import user, contact, travels, bookings, changes
@@ -1,8 +1,18 @@
 
+import itertools  # For round-robin over the read replicas
+import threading
+import time
+
 from sqlalchemy import create_engine  # For creating a database engine
+from sqlalchemy.engine import make_url  # For parsing database URLs
+from sqlalchemy.exc import OperationalError  # Raised when a database can't be reached
 from sqlalchemy.ext.declarative import declarative_base  # For defining the base class for models
-from sqlalchemy.orm import sessionmaker  # For creating database sessions
-from api.config import DATABASE_URL  # Import the database URL from the configuration file
+from sqlalchemy.orm import Session, sessionmaker  # For creating database sessions
+from sqlalchemy.sql.dml import UpdateBase  # Base class of INSERT / UPDATE / DELETE
+from starlette.concurrency import run_in_threadpool  # For running blocking calls off the event loop
+from api.config import (  # Import the database settings from the configuration file
+    DATABASE_URL, DB_ASYNC, ASYNC_DATABASE_URL, DATABASE_REPLICA_URLS, REPLICA_RETRY_AFTER,
+)
 
 # Create the database engine using the DATABASE_URL from config
 # `check_same_thread` argument is needed for SQLite, but ignored for other databases.
@@ -17,14 +27,231 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Define a base class for SQLAlchemy models
 Base = declarative_base()
 
+# Async drivers used for each backend when ASYNC_DATABASE_URL is not given
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Maps a sync database URL onto the async driver for the same backend.
+
+    :param url: Sync database URL (e.g. 'sqlite:///./test.db').
+    :return: The same URL using the async driver (e.g. 'sqlite+aiosqlite:///./test.db').
+    """
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+# The async engine is only created when async mode is enabled, so greenlet and
+# the async drivers are not required for the default (sync) deployment.
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL or to_async_url(DATABASE_URL))
+    # expire_on_commit=False keeps committed objects readable after the session
+    # has left the greenlet, which is where FastAPI serializes the response.
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+# ----------------------------------------------------------------------------
+# Read replicas
+# Read-only endpoints use a RoutingSession: its SELECTs go to one replica picked
+# round-robin per request, while anything that writes (flushes, INSERT / UPDATE /
+# DELETE, SELECT ... FOR UPDATE) goes to the primary. After the first write the
+# session stays on the primary, so a request always reads its own writes.
+# ----------------------------------------------------------------------------
+class ReplicaPool:
+    """
+    Round-robin over the replica engines, skipping replicas that recently failed.
+
+    The health check is passive: a replica that raises a connection-level error
+    is marked down for REPLICA_RETRY_AFTER seconds (the request is retried on the
+    primary), then gets traffic again.
+    """
+
+    def __init__(self, engines: list, retry_after: float):
+        """
+        :param engines: Sync engines of the replicas.
+        :param retry_after: Seconds a failed replica is skipped.
+        """
+        self.engines = engines
+        self.retry_after = retry_after
+        self._down_until = [0.0] * len(engines)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def pick(self):
+        """
+        Returns the next healthy replica engine, or None if there is none.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                index = next(self._counter) % len(self.engines)
+                if self._down_until[index] <= now:
+                    return self.engines[index]
+        return None
+
+    def mark_down(self, engine):
+        """
+        Takes a replica out of rotation for `retry_after` seconds.
+        """
+        with self._lock:
+            self._down_until[self.engines.index(engine)] = time.monotonic() + self.retry_after
+
+    def status(self) -> list[tuple]:
+        """
+        Returns (engine, is_up) for every replica.
+        """
+        now = time.monotonic()
+        return [(engine, down_until <= now) for engine, down_until in zip(self.engines, self._down_until)]
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from the replica in `info["replica"]` (when set) and
+    writes to its regular bind, the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        replica = self.info.get("replica")
+        if replica is None or self.info.get("wrote"):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        if self._flushing or isinstance(clause, UpdateBase) or getattr(clause, "_for_update_arg", None) is not None:
+            self.info["wrote"] = True
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return self._replica_bind(replica)
+
+    def _replica_bind(self, replica):
+        return replica
+
+
+class AsyncRoutingSession(RoutingSession):
+    """
+    RoutingSession behind an AsyncSession: reads go to the async engine of the
+    picked replica.
+    """
+
+    def _replica_bind(self, replica):
+        return async_replica_binds[replica]
+
+
+def _engine_options(url: str) -> dict:
+    return {"connect_args": {"check_same_thread": False}} if "sqlite" in url else {}
+
+
+# Sync engines of DATABASE_REPLICA_URLS. Like the primary, every replica also gets
+# an async engine when DB_ASYNC is enabled; the sync one then only serves readers
+# with their own session (exports).
+replica_engines = [create_engine(url, **_engine_options(url)) for url in DATABASE_REPLICA_URLS]
+replica_pool = ReplicaPool(replica_engines, REPLICA_RETRY_AFTER)
+
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+async_replica_engines = []
+async_replica_binds = {}  # sync replica engine -> sync_engine of its AsyncEngine
+AsyncReadSessionLocal = None
+if DB_ASYNC:
+    async_replica_engines = [create_async_engine(to_async_url(url)) for url in DATABASE_REPLICA_URLS]
+    async_replica_binds = {
+        replica: async_replica.sync_engine for replica, async_replica in zip(replica_engines, async_replica_engines)
+    }
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_engine, sync_session_class=AsyncRoutingSession, autoflush=False, expire_on_commit=False
+    )
+
+
+def uses_replica(db: Session) -> bool:
+    """
+    Tells whether the session's reads currently go to a replica, which may lag
+    behind the primary (e.g. to cache its results for a shorter time).
+    """
+    return db.info.get("replica") is not None and not db.info.get("wrote")
+
+
+def read_session() -> Session:
+    """
+    Creates a sync RoutingSession bound to the next healthy replica, for readers
+    that manage their own session (e.g. streaming exports).
+    """
+    db = ReadSessionLocal()
+    db.info["replica"] = replica_pool.pick()
+    return db
+
+
+class Database:
+    """
+    Request-scoped handle used by the routers to run the CRUD functions.
+
+    The functions in api/crud take a plain `Session`. In async mode they are run
+    through `AsyncSession.run_sync`, so the driver I/O is awaited on the event loop
+    and no threadpool worker is held. In sync mode they run in the threadpool,
+    exactly like a sync `def` route would.
+
+    Each CRUD function is a complete unit of work, so the session is closed after
+    every call. That hands the connection back to the pool straight away instead
+    of holding it while the response is serialized and sent; under load, requests
+    holding connections until teardown could exhaust the pool while the threads
+    that would release them were all waiting for a connection.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Runs a CRUD function with this request's session as its first argument.
+
+        If the session reads from a replica and the replica can't be reached, the
+        replica is marked down and the call is retried on the primary.
+
+        :param fn: CRUD function taking `db: Session` as its first argument.
+        :return: Whatever the CRUD function returns (loaded objects stay readable).
+        """
+        try:
+            return await self._run(fn, *args, **kwargs)
+        except OperationalError:
+            info = self.session.info
+            replica = info.get("replica")
+            if replica is None or info.get("wrote"):
+                raise
+            replica_pool.mark_down(replica)
+            info["replica"] = None
+            return await self._run(fn, *args, **kwargs)
+
+    async def _run(self, fn, *args, **kwargs):
+        if DB_ASYNC:
+            try:
+                return await self.session.run_sync(fn, *args, **kwargs)
+            finally:
+                await self.session.close()
+        return await run_in_threadpool(_run_and_release, self.session, fn, *args, **kwargs)
+
+
+def _run_and_release(session, fn, *args, **kwargs):
+    """
+    Calls a CRUD function, then closes the session to release its connection.
+    """
+    try:
+        return fn(session, *args, **kwargs)
+    finally:
+        session.close()
+
+
 # Dependency to get the database session
 def get_db():
     """
     Dependency to get a database session.
-    
-    This function is used as a dependency for FastAPI routes to provide a 
+
+    This function is used as a dependency for FastAPI routes to provide a
     database session to the API endpoints.
-    
+
     :yield: A database session object.
     """
     db = SessionLocal()  # Create a new session using the sessionmaker
@@ -32,3 +259,56 @@ def get_db():
         yield db  # Yield the session to be used by the endpoint
     finally:
         db.close()  # Close the session after the request is processed
+
+
+# Dependency to get a Database handle for the configured (sync or async) engine
+async def get_database():
+    """
+    Dependency used by the `async def` routes.
+
+    Yields a `Database` bound to an `AsyncSession` when DB_ASYNC is enabled,
+    otherwise to a regular `Session` whose calls run in the threadpool.
+
+    :yield: A Database handle.
+    """
+    if DB_ASYNC:
+        async with AsyncSessionLocal() as session:
+            yield Database(session)
+        return
+
+    db = SessionLocal()
+    try:
+        yield Database(db)
+    finally:
+        await run_in_threadpool(db.close)
+
+
+# Dependency for read-only routes: a Database whose reads go to a replica
+async def get_read_database():
+    """
+    Dependency used by the read-only `async def` routes.
+
+    Like `get_database`, but the session reads from the next healthy replica
+    (falling back to the primary when none is configured or healthy). Writes made
+    through it still go to the primary.
+
+    :yield: A Database handle.
+    """
+    replica = replica_pool.pick() if replica_pool.engines else None
+    if replica is None:
+        async for db in get_database():
+            yield db
+        return
+
+    if DB_ASYNC:
+        async with AsyncReadSessionLocal() as session:
+            session.info["replica"] = replica
+            yield Database(session)
+        return
+
+    db = ReadSessionLocal()
+    db.info["replica"] = replica
+    try:
+        yield Database(db)
+    finally:
+        await run_in_threadpool(db.close)
@@ -1,19 +1,27 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
 from api.database.connection import Base
+from api.database.models.travels import Travel
+from api.database.types import Timestamp
 
 class Booking(Base):
     __tablename__ = "booking"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # Travel the seats were reserved on; NULL for bookings made without one (and older rows).
+    # The route, price and seats stay copied on the booking, so deleting the travel keeps it
+    travel_id = Column(Integer, ForeignKey("travels.id", ondelete="SET NULL"), nullable=True, index=True)
     from_location = Column(String(255),nullable=False)
     to_location = Column(String(255),nullable=False)
     seats = Column(Integer,nullable=False)
     price_per_seat = Column(Float,nullable=False)
     total_price = Column(Float,nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow,nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(Timestamp, default=datetime.utcnow,nullable=False, index=True)
+    updated_at = Column(Timestamp, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Never loaded lazily (one query per booking): use selectinload(Booking.travel)
+    travel = relationship(Travel, lazy="raise")
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from datetime import datetime
+
+from api.database.connection import Base
+
+class Change(Base):
+    # Append-only log of travel and booking writes, read by GET /changes.
+    # Rows are inserted in the same transaction as the write they describe.
+    __tablename__ = "change_log"
+    __table_args__ = (
+        # /changes?resource= reads one resource's entries in sequence order
+        Index("ix_change_log_resource_seq", "resource", "seq"),
+        # Never reuse a sequence number on SQLite, even after deleting the last rows
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    resource = Column(String(20), nullable=False)  # "travel" or "booking"
+    resource_id = Column(Integer, nullable=False)
+    op = Column(String(10), nullable=False)  # "create", "update" or "delete"
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
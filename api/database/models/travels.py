@@ -1,18 +1,25 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 from api.database.connection import Base
+from api.database.types import Timestamp
 
 class Travel(Base):
     __tablename__ = "travels"
+    __table_args__ = (
+        # Route search filters on from_location, optionally narrowed by to_location
+        Index("ix_travels_from_to", "from_location", "to_location"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     image = Column(String(255),nullable=False)
     from_location = Column(String(255),nullable=False)
     to_location = Column(String(255),nullable=False)
     time = Column(String(255),nullable=False)
+    # Typed departure, for indexed time-window queries; `time` keeps the display string
+    departure_at = Column(DateTime, nullable=True, index=True)
     seats = Column(Integer,nullable=False)
     price = Column(Float,nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(Timestamp, default=datetime.utcnow)
+    updated_at = Column(Timestamp, default=datetime.utcnow, onupdate=datetime.utcnow)
 
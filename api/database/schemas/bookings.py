@@ -2,6 +2,7 @@ from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
 
+from api.database.schemas.travels import TravelOut
 
 
 # ----- Booking -----
@@ -16,7 +17,7 @@ class BookingBase(BaseModel):
 
 
 class BookingCreate(BookingBase):
-    pass
+    travel_id: Optional[int] = None  # When given, the seats are reserved on this travel atomically
 
 
 class BookingUpdate(BaseModel):
@@ -32,8 +33,13 @@ class BookingUpdate(BaseModel):
 
 class BookingOut(BookingBase):
     id: int
+    travel_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class BookingWithTravel(BookingOut):
+    travel: Optional[TravelOut] = None  # /bookings/user/{user_id}?expand=travel
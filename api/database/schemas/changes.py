@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import Literal, Optional, Union
+
+from api.database.schemas.bookings import BookingOut
+from api.database.schemas.travels import TravelOut
+
+
+# ----- Change -----
+class Change(BaseModel):
+    seq: int
+    resource: Literal["travel", "booking"]
+    id: int
+    op: Literal["create", "update", "delete"]
+    data: Optional[Union[TravelOut, BookingOut]] = None  # Current row; None for deletes
+
+
+class ChangePage(BaseModel):
+    changes: list[Change]
+    next: str  # Pass back as `since` to get the following changes
+    has_more: bool  # More changes are ready; ask again right away
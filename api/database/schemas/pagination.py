@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+# ----- Page -----
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to get the next page; None on the last page
+
+
+# ----- Lookup -----
+class Lookup(BaseModel, Generic[T]):
+    items: dict[int, T]  # Rows found, keyed by id, in the order the ids were asked for
+    missing: list[int] = []  # Requested ids with no row
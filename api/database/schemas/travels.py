@@ -8,10 +8,9 @@ class TravelBase(BaseModel):
     from_location: str
     to_location: str
     time: str
+    departure_at: Optional[datetime] = None
     seats: int
     price: float
-    created_at: datetime
-    updated_at : datetime
 
 
 
@@ -25,9 +24,17 @@ class TravelUpdate(BaseModel):  # <- Inherit from BaseModel directly
     from_location: Optional[str] = None
     to_location: Optional[str] = None
     time: Optional[str] = None
+    departure_at: Optional[datetime] = None
     seats: Optional[int] = None  # <- Make it optional
     price: Optional[float] = None
+class LocationSuggestion(BaseModel):
+    location: str
+    bookings: int
+
 class TravelOut(TravelBase):
+    # Set by the server on create and update, not accepted from clients
+    created_at: datetime
+    updated_at : datetime
     id: int
 
     class Config:
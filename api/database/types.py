@@ -0,0 +1,6 @@
+from sqlalchemy import DateTime
+from sqlalchemy.dialects import mysql
+
+# created_at / updated_at feed the ETags, so MySQL keeps their microseconds
+# (its plain DATETIME rounds to whole seconds)
+Timestamp = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
@@ -0,0 +1,163 @@
+import asyncio
+import time
+from collections import defaultdict
+
+from api.config import STREAM_HEARTBEAT_SECONDS, STREAM_MAX_SECONDS
+from api.serialization import dumps
+
+
+class Subscription:
+    """
+    Changes of a set of travels, waiting to be sent to one client.
+
+    Pending changes are conflated per travel: a newer change of a travel replaces
+    the one not sent yet, since clients only need the latest seats and price. A
+    slow client therefore holds at most one pending change per subscribed travel,
+    however many writes happen, and never slows down the publishers or the other
+    subscribers.
+    """
+
+    def __init__(self, travel_ids: frozenset):
+        self.travel_ids = travel_ids
+        self._pending = {}  # travel id -> latest change
+        self._ready = asyncio.Event()
+
+    def _push(self, change: dict) -> bool:
+        # Called on the event loop thread; returns whether an unsent change was replaced
+        replaced = change["id"] in self._pending
+        self._pending[change["id"]] = change
+        self._ready.set()
+        return replaced
+
+    async def changes(self, timeout: float | None = None) -> list[dict]:
+        """
+        Waits for changes and returns them, oldest first.
+
+        :param timeout: Seconds to wait; an empty list is returned when nothing
+            changed in that time (e.g. to send a heartbeat).
+        :return: Pending changes, or an empty list on timeout.
+        """
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._ready.clear()
+        changes, self._pending = list(self._pending.values()), {}
+        return changes
+
+
+class TravelEvents:
+    """
+    In-process publish/subscribe of travel changes (seats, price, deletion).
+
+    The CRUD functions publish after committing, from threadpool workers (sync
+    mode) or from the event loop (async mode). Delivery is always handed over to
+    the event loop with `call_soon_threadsafe`, so subscriptions are only touched
+    on one thread and publishing never blocks on slow clients. Each worker process
+    only sees its own writes.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._subscribers = defaultdict(set)  # travel id -> subscriptions
+        self.subscriptions = 0
+        self.published = 0
+        self.conflated = 0  # changes replaced before a slow subscriber received them
+
+    def subscribe(self, travel_ids) -> Subscription:
+        """
+        Subscribes to the changes of the given travels. Call from the event loop.
+        """
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(frozenset(travel_ids))
+        for travel_id in subscription.travel_ids:
+            self._subscribers[travel_id].add(subscription)
+        self.subscriptions += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """
+        Removes a subscription. Call from the event loop.
+        """
+        for travel_id in subscription.travel_ids:
+            subscribers = self._subscribers.get(travel_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[travel_id]
+        self.subscriptions -= 1
+
+    def wants(self, travel_id: int) -> bool:
+        """
+        Tells whether anyone listens to a travel, so publishers can skip reading
+        the values of a change nobody will receive.
+        """
+        return travel_id in self._subscribers
+
+    def publish(self, travel_id: int, **values):
+        """
+        Publishes a change of a travel, e.g. `publish(1, seats=3, price=10.0)` or
+        `publish(1, deleted=True)`. Safe to call from any thread.
+        """
+        if not self.wants(travel_id) or self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, {"id": travel_id, **values})
+        except RuntimeError:  # the loop has been closed
+            self._loop = None
+
+    def _deliver(self, change: dict):
+        self.published += 1
+        for subscription in list(self._subscribers.get(change["id"], ())):
+            if subscription._push(change):
+                self.conflated += 1
+
+    def stats(self) -> dict:
+        """
+        Returns the number of open subscriptions, published and conflated changes.
+        """
+        return {"subscriptions": self.subscriptions, "published": self.published, "conflated": self.conflated}
+
+
+# Fed by the travel and booking CRUD functions, read by GET /travels/stream
+travel_events = TravelEvents()
+
+
+def format_event(event: str, data) -> bytes:
+    """
+    Encodes one Server-Sent Event with a JSON payload.
+    """
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+async def stream_changes(subscription: Subscription, snapshot: list[dict]):
+    """
+    Generates the Server-Sent Events of a /travels/stream connection: the
+    snapshot, then the changes as they are published.
+
+    The stream ends after STREAM_MAX_SECONDS (EventSource clients reconnect on
+    their own), so connections get spread over restarted or added workers and
+    don't hold up a graceful shutdown forever. The subscription is removed when
+    the stream ends or the client disconnects.
+
+    :param subscription: Subscription taken before the snapshot was read.
+    :param snapshot: Current {"id", "seats", "price"} of the subscribed travels.
+    :yield: Encoded events.
+    """
+    deadline = time.monotonic() + STREAM_MAX_SECONDS
+    try:
+        # Clients reconnect after 1 s instead of the browser default of ~3 s
+        yield b"retry: 1000\n\n" + b"".join(format_event("snapshot", row) for row in snapshot)
+        while (remaining := deadline - time.monotonic()) > 0:
+            changes = await subscription.changes(min(STREAM_HEARTBEAT_SECONDS, remaining))
+            if changes:
+                yield b"".join(
+                    format_event("deleted", {"id": change["id"]}) if change.get("deleted")
+                    else format_event("travel", change)
+                    for change in changes
+                )
+            else:
+                yield b": keep-alive\n\n"
+    finally:
+        travel_events.unsubscribe(subscription)
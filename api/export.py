@@ -0,0 +1,62 @@
+import csv  # For the CSV export format
+import io
+import json  # For the NDJSON export format
+from datetime import datetime
+
+from api.crud.bookings import iter_booking_rows
+from api.database.connection import read_session
+from api.database.models.bookings import Booking
+
+# Media type and file extension of each export format
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+
+def _json_default(value):
+    # Same representation Pydantic uses for the datetimes in BookingOut
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _ndjson_chunk(rows) -> bytes:
+    return "".join(json.dumps(row._asdict(), default=_json_default) + "\n" for row in rows).encode()
+
+
+def _csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+def export_bookings(fmt: str, user_id: int | None = None, created_from: datetime | None = None,
+                    created_to: datetime | None = None, batch_size: int = 1000):
+    """
+    Generates a bookings export, one encoded chunk per database batch.
+
+    The generator owns its own session, because it keeps reading after the route
+    has returned (StreamingResponse pulls the chunks in the threadpool). Only one
+    batch of rows is in memory at a time.
+
+    :param fmt: "ndjson" or "csv".
+    :param user_id: Only export this user's bookings.
+    :param created_from: Only bookings created at or after this time.
+    :param created_to: Only bookings created before this time.
+    :param batch_size: Rows fetched from the server-side cursor per chunk.
+    :yield: Encoded chunks of the export.
+    """
+    db = read_session()
+    try:
+        if fmt == "csv":
+            yield _csv_chunk([[column.name for column in Booking.__table__.columns]])
+        encode = _csv_chunk if fmt == "csv" else _ndjson_chunk
+        for rows in iter_booking_rows(db, user_id, created_from, created_to, batch_size):
+            yield encode(rows)
+    finally:
+        db.close()
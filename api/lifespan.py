@@ -0,0 +1,90 @@
+import logging
+from contextlib import asynccontextmanager
+
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+
+from api.config import CONTACT_QUEUE, DB_ASYNC, WARM_CACHES, WARM_POOL_CONNECTIONS
+from api.contact_queue import contact_queue
+from api.crud import travels
+from api.database import connection
+from api.security import stop_hashing
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_sync_pool(count: int):
+    # Check out `count` connections at once, then return them all to the pool
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(connection.engine.connect())
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+async def _warm_async_pool(count: int):
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(await connection.async_engine.connect())
+    finally:
+        for conn in connections:
+            await conn.close()
+
+
+async def warm_up():
+    """
+    Prepares a worker for traffic: opens the pool's connections and loads the
+    first page of the travel catalog into its cache. Starts the contact queue's
+    writer in CONTACT_QUEUE mode.
+
+    The password hashing workers are left to start on the first login: spawning
+    them here delayed the first response more than it saved.
+
+    The schema is managed by Alembic (`alembic upgrade head`), not here. A failing
+    step is logged and skipped, so the worker still starts when the database is
+    briefly unreachable.
+    """
+    if WARM_POOL_CONNECTIONS:
+        try:
+            if DB_ASYNC:
+                await _warm_async_pool(WARM_POOL_CONNECTIONS)
+            else:
+                await run_in_threadpool(_warm_sync_pool, WARM_POOL_CONNECTIONS)
+        except SQLAlchemyError as exc:
+            logger.warning("Could not warm the connection pool: %s", exc)
+
+    if WARM_CACHES:
+        try:
+            async for db in connection.get_database():
+                await db.run(travels.get_travels_json)
+        except SQLAlchemyError as exc:
+            logger.warning("Could not warm the travel catalog cache: %s", exc)
+
+    if CONTACT_QUEUE:
+        contact_queue.start()
+
+
+async def shut_down():
+    """
+    Writes out the queued contact messages, stops the hashing workers and
+    closes the pooled connections.
+    """
+    await contact_queue.stop()
+    stop_hashing()
+    if connection.async_engine is not None:
+        await connection.async_engine.dispose()
+    connection.engine.dispose()
+    for replica in connection.async_replica_engines:
+        await replica.dispose()
+    for replica in connection.replica_engines:
+        replica.dispose()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await warm_up()
+    yield
+    await shut_down()
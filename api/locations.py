@@ -0,0 +1,110 @@
+import bisect  # Prefix lookups over the sorted array of location keys
+import heapq
+import threading  # CRUD functions run in threadpool workers, so the index must be thread-safe
+from collections import Counter
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from api.database.models.bookings import Booking
+from api.database.models.travels import Travel
+
+
+class LocationIndex:
+    """
+    In-memory prefix index of the locations served by travels, for autocomplete.
+
+    Locations are kept in a sorted array of case-folded keys, so the matches for a
+    prefix are one contiguous slice found with two binary searches. Matches are
+    ranked by how many bookings start or end at the location.
+
+    The index is built from the database on first use and then kept up to date
+    incrementally by the travel and booking CRUD functions; updates that arrive
+    before the first build are ignored, since the build reads them from the
+    database. Each worker process has its own copy.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._keys = []  # sorted case-folded names
+        self._names = {}  # key -> display name
+        self._travels = Counter()  # key -> number of travels using the location
+        self._bookings = Counter()  # key -> number of bookings from/to the location
+        self._lock = threading.Lock()
+
+    def build(self, db: Session):
+        """
+        Loads every location and booking count from the database, replacing the
+        current contents.
+
+        :param db: Database session.
+        """
+        with self._lock:
+            self._keys, self._names = [], {}
+            self._travels, self._bookings = Counter(), Counter()
+            for column in (Travel.from_location, Travel.to_location):
+                for name, count in db.query(column, func.count()).group_by(column):
+                    self._add(name, count)
+            for column in (Booking.from_location, Booking.to_location):
+                for name, count in db.query(column, func.count()).group_by(column):
+                    self._bookings[name.casefold()] += count
+            self.ready = True
+
+    def _add(self, name: str, count: int = 1):
+        key = name.casefold()
+        if key not in self._travels:
+            bisect.insort(self._keys, key)
+        self._travels[key] += count
+        self._names[key] = name
+
+    def _remove(self, name: str):
+        key = name.casefold()
+        if key not in self._travels:
+            return
+        self._travels[key] -= 1
+        if self._travels[key] <= 0:
+            del self._travels[key]
+            del self._names[key]
+            self._keys.pop(bisect.bisect_left(self._keys, key))
+
+    def add_travel(self, from_location: str, to_location: str):
+        """Records a new travel's locations."""
+        with self._lock:
+            if self.ready:
+                self._add(from_location)
+                self._add(to_location)
+
+    def remove_travel(self, from_location: str, to_location: str):
+        """Forgets a deleted travel's locations; a location goes once no travel uses it."""
+        with self._lock:
+            if self.ready:
+                self._remove(from_location)
+                self._remove(to_location)
+
+    def record_bookings(self, from_location: str, to_location: str, count: int = 1):
+        """Adjusts the booking counts used for ranking (negative `count` for deletions)."""
+        with self._lock:
+            if self.ready:
+                self._bookings[from_location.casefold()] += count
+                self._bookings[to_location.casefold()] += count
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[dict]:
+        """
+        Returns the most booked locations starting with `prefix` (case-insensitive).
+
+        :param prefix: Start of the location name typed so far.
+        :param limit: Maximum number of suggestions.
+        :return: List of {"location", "bookings"} dicts, most booked first, then by name.
+        """
+        key = prefix.casefold()
+        with self._lock:
+            start = bisect.bisect_left(self._keys, key)
+            end = bisect.bisect_left(self._keys, key + "\U0010ffff", start)
+            best = heapq.nsmallest(
+                limit, self._keys[start:end], key=lambda match: (-self._bookings[match], match)
+            )
+            return [{"location": self._names[match], "bookings": self._bookings[match]} for match in best]
+
+
+# Shared by the travel and booking CRUD functions and the autocomplete route
+location_index = LocationIndex()
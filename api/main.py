@@ -1,13 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import auth, users, contact, travels, bookings
-from api.database.connection import engine
-from api.database.base import Base
+from fastapi.responses import PlainTextResponse
+from api.routes import auth, users, contact, travels, bookings, changes
+from api.database.connection import engine, async_engine, replica_engines, async_replica_engines
+from api import metrics
+from api.lifespan import lifespan
 
-Base.metadata.create_all(bind=engine)
-
-
-app = FastAPI()
+# The schema is created and migrated with Alembic (`alembic upgrade head`); the
+# lifespan hook only warms the connection pool and caches.
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,6 +18,23 @@ app.add_middleware(
     allow_headers=["*"],           # Accept all HTTP headers
 )
 
+# Per-route latency, status, in-flight and SQL metrics, plus the Server-Timing header.
+# Added last so it is the outermost middleware and times the whole request.
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(engine, "primary")
+if async_engine is not None:
+    metrics.instrument_engine(async_engine.sync_engine, "primary_async")
+for number, replica in enumerate(replica_engines, 1):
+    metrics.instrument_engine(replica, f"replica{number}")
+for number, replica in enumerate(async_replica_engines, 1):
+    metrics.instrument_engine(replica.sync_engine, f"replica{number}_async")
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 
@@ -30,3 +48,6 @@ app.include_router(travels.router, prefix="/travels", tags=["Travels"])
 
 app.include_router(bookings.router, prefix="/bookings", tags=["Bookings"])
 
+# Change feed for partner systems mirroring travels and bookings
+app.include_router(changes.router, prefix="/changes", tags=["Changes"])
+
@@ -0,0 +1,264 @@
+import bisect
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from api.cache import catalog_cache, principal_cache
+from api.contact_queue import contact_queue
+from api.events import travel_events
+from api.database.connection import replica_pool
+from api.security import hash_stats
+
+# Latency buckets in seconds (the Prometheus client defaults)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+class Counter:
+    """
+    Monotonic counter with labels, rendered in Prometheus text format.
+
+    Metrics are only updated from the event loop (the middleware), so they need
+    no locking.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}  # label values -> value
+
+    def inc(self, *label_values, amount: float = 1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        for label_values, value in self.values.items():
+            yield self.name, dict(zip(self.labels, label_values)), value
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, *label_values, value: float):
+        self.values[label_values] = value
+
+
+class Histogram:
+    """Cumulative histogram with labels, rendered in Prometheus text format."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.values = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, *label_values, value: float):
+        series = self.values.get(label_values)
+        if series is None:
+            series = self.values[label_values] = [0] * len(self.buckets) + [0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def samples(self):
+        for label_values, series in self.values.items():
+            labels = dict(zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": repr(bound)}, cumulative
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, series[-1]
+            yield f"{self.name}_sum", labels, series[-2]
+            yield f"{self.name}_count", labels, series[-1]
+
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency.", ("method", "route"))
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being processed.")
+DB_STATEMENTS = Counter("db_statements_total", "SQL statements executed, by route.", ("method", "route"))
+DB_TIME = Counter("db_time_seconds_total", "Time spent executing SQL, by route.", ("method", "route"))
+POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections checked out of the pool.", ("engine",))
+
+IN_FLIGHT.set(value=0)
+
+METRICS = [REQUESTS, LATENCY, IN_FLIGHT, DB_STATEMENTS, DB_TIME, POOL_CHECKOUTS]
+
+
+class RequestStats:
+    """SQL statement count and time of the current request."""
+
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+# Set by the middleware for each request. Context variables are copied into the
+# threadpool (sync mode) and into run_sync's greenlet (async mode), so the engine
+# events below see the stats object of the request that issued the statement.
+request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's execution context, which is discarded with it, so
+    # nothing accumulates on the pooled connection when a statement fails
+    context._metrics_started = time.perf_counter()
+
+
+def _record_statement(context):
+    started = getattr(context, "_metrics_started", None)
+    stats = request_stats.get()
+    if started is not None and stats is not None:
+        stats.statements += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_statement(context)
+
+
+def _handle_error(exception_context):
+    # Failed statements (e.g. constraint violations) count too, with the time they took
+    if exception_context.execution_context is not None:
+        _record_statement(exception_context.execution_context)
+
+
+def instrument_engine(engine, name: str):
+    """
+    Hooks the statement timing and pool checkout events onto a (sync) engine.
+    For an AsyncEngine pass `async_engine.sync_engine`.
+
+    :param engine: SQLAlchemy Engine.
+    :param name: Value of the `engine` label in the pool metrics.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    event.listen(engine.pool, "checkout", lambda *args: POOL_CHECKOUTS.inc(name))
+    _engines[name] = engine
+
+
+_engines = {}
+
+
+def _route_label(scope) -> str:
+    # The route template keeps the label cardinality bounded (no ids in paths).
+    # It is rebuilt from the path and its matched parameters, because the route in
+    # the scope only knows its path relative to the router prefix.
+    if "endpoint" not in scope:
+        return "unmatched"
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    return "/".join(
+        f"{{{names[segment]}}}" if segment in names else segment for segment in scope["path"].split("/")
+    )
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status codes, in-flight requests and SQL
+    statement counts / time per route, and adding a Server-Timing header with the
+    database and total time of each response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} statements", '
+                    f"total;dur={total_ms:.2f}"
+                )
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode())]
+            await send(message)
+
+        IN_FLIGHT.inc(amount=1)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            IN_FLIGHT.inc(amount=-1)
+            request_stats.reset(token)
+            labels = (scope["method"], _route_label(scope))
+            LATENCY.observe(*labels, value=time.perf_counter() - started)
+            REQUESTS.inc(*labels, str(status))
+            DB_STATEMENTS.inc(*labels, amount=stats.statements)
+            DB_TIME.inc(*labels, amount=stats.db_seconds)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _render_metric(name: str, kind: str, help: str, samples) -> list[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for sample_name, labels, value in samples:
+        label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+        lines.append(f"{sample_name}{{{label_text}}} {value}" if label_text else f"{sample_name} {value}")
+    return lines
+
+
+def _snapshot_gauges() -> list[tuple]:
+    # (name, help, samples) read at scrape time from the pools, caches, streams, contact queue
+    # and hashing executor
+    pool_samples = {"size": [], "checked_out": [], "overflow": []}
+    for name, engine in _engines.items():
+        pool = engine.pool
+        for key, method in (("size", "size"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+            if hasattr(pool, method):  # SingletonThreadPool / NullPool don't track these
+                pool_samples[key].append((f"db_pool_{key}", {"engine": name}, getattr(pool, method)()))
+
+    # Named like the engines instrumented in main.py
+    replica_samples = [("db_replica_up", {"engine": f"replica{number}"}, int(up))
+                       for number, (_, up) in enumerate(replica_pool.status(), 1)]
+
+    cache_samples = {}
+    for name, cache in (("principal", principal_cache), ("catalog", catalog_cache)):
+        for key, value in cache.stats().items():
+            cache_samples.setdefault(key, []).append((f"cache_{key}", {"cache": name}, value))
+
+    return [
+        *((f"db_pool_{key}", f"Pool {key.replace('_', ' ')}.", samples) for key, samples in pool_samples.items()),
+        ("db_replica_up", "Replica in rotation (1) or skipped after a failure (0).", replica_samples),
+        *((f"cache_{key}", f"Cache {key}.", samples) for key, samples in cache_samples.items()),
+        *((f"travel_stream_{key}", f"Travel change streams: {key}.", [(f"travel_stream_{key}", {}, value)])
+          for key, value in travel_events.stats().items()),
+        *((f"contact_queue_{key}", f"Contact write-behind queue: {key}.", [(f"contact_queue_{key}", {}, value)])
+          for key, value in contact_queue.stats().items()),
+        *((f"password_hash_{key}", f"Password hashing executor: {key.replace('_', ' ')}.",
+           [(f"password_hash_{key}", {}, value)]) for key, value in hash_stats.items()),
+    ]
+
+
+def render() -> str:
+    """
+    Renders every metric in the Prometheus text exposition format (version 0.0.4).
+    """
+    lines = []
+    for metric in METRICS:
+        lines += _render_metric(metric.name, metric.kind, metric.help, metric.samples())
+    for name, help, samples in _snapshot_gauges():
+        lines += _render_metric(name, "gauge", help, samples)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,139 @@
+import base64  # For making cursors URL-safe and opaque
+import json  # For packing the cursor values
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import func, tuple_
+
+from api.config import GET_MANY_MAX_IDS
+
+# Page size used when the client does not pass `limit`
+DEFAULT_PAGE_SIZE = 50
+
+# Largest page a client may ask for
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Packs the sort key of the last row of a page into an opaque cursor.
+
+    :param values: Values of the ordering columns for the last row.
+    :return: URL-safe cursor string.
+    """
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    """
+    Unpacks a cursor produced by `encode_cursor` for the given ordering columns.
+
+    :param cursor: Cursor string sent by the client.
+    :param columns: Ordering columns the cursor was built from.
+    :return: Values of the ordering columns, converted back to Python types.
+    :raises HTTPException: 400 if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif not isinstance(value, python_type):
+                raise ValueError(cursor)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# OpenAPI description of the `ids` query parameter of the get_many endpoints
+IDS_DESCRIPTION = "Ids to look up (repeat the parameter: ids=1&ids=2)"
+
+
+def lookup(query, id_column, ids: list[int]) -> dict:
+    """
+    Fetches the rows with the given ids in one `WHERE id IN (...)` query, for
+    the get_many endpoints.
+
+    :param query: SQLAlchemy query of the resource (objects or columns).
+    :param id_column: Primary key column, e.g. Travel.id; must be selected by the query.
+    :param ids: Requested ids; duplicates are ignored.
+    :return: Dictionary with the found `items` keyed by id, in the requested
+        order, and the `missing` ids.
+    :raises HTTPException: 400 if more than GET_MANY_MAX_IDS ids are requested.
+    """
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > GET_MANY_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {GET_MANY_MAX_IDS} ids per request")
+    found = {getattr(row, id_column.key): row for row in query.filter(id_column.in_(ids))} if ids else {}
+    return {
+        "items": {row_id: found[row_id] for row_id in ids if row_id in found},
+        "missing": [row_id for row_id in ids if row_id not in found],
+    }
+
+
+def paginate(query, columns: list, limit: int, cursor: str | None = None):
+    """
+    Applies keyset pagination to a query.
+
+    The query is ordered by `columns` (the last one must be unique, usually the
+    primary key) and only rows after the cursor are read, so every page costs one
+    index range scan no matter how deep into the table it is.
+
+    :param query: SQLAlchemy query to paginate.
+    :param columns: Ordering columns, e.g. [Travel.id].
+    :param limit: Maximum number of rows to return.
+    :param cursor: Cursor returned with the previous page, or None for the first page.
+    :return: Dictionary with the page `items` and the `next_cursor` (None on the last page).
+    """
+    query = _after_cursor(query, columns, cursor)
+
+    # Fetch one extra row to know whether there is a next page
+    rows = query.order_by(*columns).limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def page_state(query, columns: list, limit: int, cursor: str | None, id_column, updated_column) -> tuple:
+    """
+    Describes the page `paginate` would return, with one aggregate query instead
+    of loading its rows: used to answer conditional requests cheaply.
+
+    :param query: Same query as passed to `paginate`.
+    :param columns: Same ordering columns as passed to `paginate`.
+    :param limit: Maximum number of rows in the page.
+    :param cursor: Cursor of the page, or None for the first page.
+    :param id_column: Primary key column, e.g. Travel.id.
+    :param updated_column: Last-update column, e.g. Travel.updated_at.
+    :return: (row count, sum of ids, latest update time, whether there is a next page).
+    """
+    query = _after_cursor(query, columns, cursor).order_by(*columns)
+    page = query.with_entities(id_column.label("id"), updated_column.label("updated_at")).limit(limit).subquery()
+    has_next = query.with_entities(id_column).offset(limit).limit(1).exists()
+    session = query.session
+    count, id_sum, last_modified, next_exists = session.query(
+        func.count(), func.coalesce(func.sum(page.c.id), 0), func.max(page.c.updated_at), has_next
+    ).one()
+    # int(): MySQL returns SUM() as a Decimal, which would change the ETag
+    return count, int(id_sum), last_modified, bool(next_exists)
+
+
+def _after_cursor(query, columns: list, cursor: str | None):
+    # Keeps only the rows after the cursor (all rows on the first page)
+    if not cursor:
+        return query
+    values = decode_cursor(cursor, columns)
+    if len(columns) == 1:
+        return query.filter(columns[0] > values[0])
+    return query.filter(tuple_(*columns) > tuple_(*values))
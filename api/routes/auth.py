@@ -1,9 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from api.database.connection import get_db
+from api.database.connection import Database, get_database
 from api.database.schemas.user import UserCreate, UserLogin, UserResponse
-from api.crud.user import create_user, get_user_by_email, get_user_by_mobile
-from api.security import verify_password
+from api.crud.user import create_user, find_registration_conflict, get_user_by_email, update_password_hash
+from api.security import hash_password_async, needs_rehash, verify_password_async
 from fastapi.security import OAuth2PasswordBearer
 from api.token import create_access_token
 
@@ -22,35 +21,33 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 # Description: Register a new user account
 # ----------------------------------------------------------------------------
 @router.post("/register", response_model=UserResponse)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: Database = Depends(get_database)):
     """
     Register a new user in the system.
 
     Steps:
-    - Check if the email is already registered.
-    - Check if the mobile number is already registered.
-    - If both are unique, create the new user in the database.
+    - Check in one query if the email or mobile number is already registered,
+      so duplicate sign-ups are turned away before any bcrypt work.
+    - Hash the password on the hashing executor.
+    - Insert the user; the unique constraints catch registrations that raced
+      past the check, with the same error messages.
 
     Parameters:
     - user: Request body with fields like name, email, password, mobile number, etc.
-    - db: Database session dependency
+    - db: Database handle dependency
 
     Returns:
     - A UserResponse object excluding sensitive info like password
     """
 
-    # Check if the email already exists in the system
-    existing_user = get_user_by_email(db, user.email)
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
+    # Check if the email or mobile number already exists in the system
+    conflict = await db.run(find_registration_conflict, user.email, user.mob_number)
+    if conflict:
+        raise HTTPException(status_code=400, detail=conflict)
 
-    # Check if the mobile number already exists in the system
-    existing_mobile = get_user_by_mobile(db, user.mob_number)
-    if existing_mobile:
-        raise HTTPException(status_code=400, detail="Mobile number already registered")
-
-    # All good, proceed to create the user and return the created user
-    return create_user(db, user)
+    # All good, hash the password off the event loop, then create and return the user
+    hashed_password = await hash_password_async(user.password)
+    return await db.run(create_user, user, hashed_password)
 
 
 # ----------------------------------------------------------------------------
@@ -58,30 +55,36 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
 # Description: Authenticate a user and return a JWT token
 # ----------------------------------------------------------------------------
 @router.post("/login")
-def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, db: Database = Depends(get_database)):
     """
     Authenticate a user and return a JWT access token if credentials are valid.
 
     Steps:
     - Find user by email.
     - Verify the password.
+    - Re-hash the password if it was stored with an outdated bcrypt cost.
     - If valid, create and return an access token.
 
     Parameters:
     - user: Request body containing email and password
-    - db: Database session dependency
+    - db: Database handle dependency
 
     Returns:
     - A dictionary with the access token and token type
     """
 
     # Fetch user record by email
-    db_user = get_user_by_email(db, user.email)
+    db_user = await db.run(get_user_by_email, user.email)
 
     # If user not found or password does not match, raise an error
-    if not db_user or not verify_password(user.password, db_user.password):
+    if not db_user or not await verify_password_async(user.password, db_user.password):
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
+    # Transparently upgrade hashes made with a different work factor
+    if needs_rehash(db_user.password):
+        new_hash = await hash_password_async(user.password)
+        await db.run(update_password_hash, db_user.id, new_hash)
+
     # Generate a JWT access token with user email as the subject
     access_token = create_access_token(data={"sub": db_user.email})
 
@@ -1,40 +1,185 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from api.database.schemas.bookings import BookingCreate, BookingOut, BookingUpdate
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from api.database.schemas.bookings import BookingCreate, BookingOut, BookingUpdate, BookingWithTravel
+from api.database.schemas.pagination import Lookup, Page
+from api.pagination import DEFAULT_PAGE_SIZE, IDS_DESCRIPTION, MAX_PAGE_SIZE
 from api.crud import bookings
-from api.database.connection import get_db
+from api.bulk import MAX_BATCH_SIZE, ingest
+from api.export import EXPORT_FORMATS, export_bookings
+from api.config import BULK_BATCH_SIZE, FAST_SERIALIZATION
+from api.serialization import (
+    FIELDS_DESCRIPTION, FastJSONResponse, lookup_content, page_content, parse_fields, sparse_item_json,
+    sparse_lookup_json, sparse_page_json,
+)
+from api import conditional
+from api.database.connection import Database, get_database, get_read_database
 
 
 router = APIRouter()
 
 @router.post("/post", response_model=BookingOut)
-def create(booking: BookingCreate, db: Session = Depends(get_db)):
-    return bookings.create_booking(db, booking)
+async def create(booking: BookingCreate, db: Database = Depends(get_database)):
+    return await db.run(bookings.create_booking, booking)
+
+@router.post("/bulk")
+async def bulk_create(
+    request: Request,
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=MAX_BATCH_SIZE),
+    db: Database = Depends(get_database),
+):
+    """
+    Streams an NDJSON (default) or CSV (Content-Type: text/csv) body of BookingCreate
+    rows into the database in batches, and reports the rows that were rejected.
+    Rows with a travel_id reserve their seats like POST /post does.
+    """
+    return await ingest(request, db, BookingCreate, bookings.bulk_create_bookings, batch_size)
+
+def _page_headers(page: dict) -> dict:
+    # ETag / Last-Modified of a loaded page, equal to what the *_validators queries compute
+    return conditional.page_validators("bookings", conditional.loaded_page_state(page)).headers()
+
+@router.get("/get", response_model=Page[BookingOut])
+async def get_all(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: Database = Depends(get_read_database),
+):
+    """
+    Lists bookings. Responses carry an ETag; a request whose If-None-Match still
+    matches gets a 304 after an aggregate query, without loading the rows.
+    """
+    names = parse_fields(BookingOut, fields)
+    if conditional.is_conditional(request):
+        validators = await db.run(bookings.get_bookings_validators, limit, cursor)
+        if conditional.etag_matches(request, validators):
+            return conditional.not_modified(validators)
+    if names:
+        page = await db.run(bookings.get_bookings, limit, cursor, bookings.booking_field_columns(names))
+        return Response(sparse_page_json(page, BookingOut, names), media_type="application/json",
+                        headers=_page_headers(page))
+    if FAST_SERIALIZATION:
+        page = await db.run(bookings.get_bookings, limit, cursor, bookings.BOOKING_OUT_COLUMNS)
+        return FastJSONResponse(page_content(page), headers=_page_headers(page))
+    page = await db.run(bookings.get_bookings, limit, cursor)
+    response.headers.update(_page_headers(page))
+    return page
+
+@router.get("/export")
+async def export(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    user_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    """
+    Streams every matching booking as NDJSON or CSV, read through a server-side
+    cursor, so memory use does not depend on the number of rows.
+    created_from is inclusive and created_to is exclusive.
+    """
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        export_bookings(format, user_id, created_from, created_to),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=bookings.{extension}"},
+    )
 
-@router.get("/get", response_model=list[BookingOut])
-def get_all(db: Session = Depends(get_db)):
-    return bookings.get_bookings(db)
+@router.get("/get_many", response_model=Lookup[BookingOut])
+async def get_many(
+    ids: list[int] = Query(..., description=IDS_DESCRIPTION),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: Database = Depends(get_read_database),
+):
+    """
+    Looks up several bookings with one query, instead of one /get_by_id request
+    each. Returns them keyed by id; ids that don't exist are listed in `missing`.
+    """
+    names = parse_fields(BookingOut, fields)
+    if names:
+        result = await db.run(bookings.get_bookings_by_ids, ids, bookings.booking_field_columns(names))
+        return Response(sparse_lookup_json(result, BookingOut, names), media_type="application/json")
+    if FAST_SERIALIZATION:
+        result = await db.run(bookings.get_bookings_by_ids, ids, bookings.BOOKING_OUT_COLUMNS)
+        return FastJSONResponse(lookup_content(result))
+    return await db.run(bookings.get_bookings_by_ids, ids)
 
 @router.get("/get_by_id/{booking_id}", response_model=BookingOut)
-def get(booking_id: int, db: Session = Depends(get_db)):
-    booking = bookings.get_booking(db, booking_id)
+async def get(
+    booking_id: int,
+    request: Request,
+    response: Response,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: Database = Depends(get_read_database),
+):
+    names = parse_fields(BookingOut, fields)
+    if conditional.is_conditional(request):
+        validators = await db.run(bookings.get_booking_validators, booking_id)
+        if validators is not None and conditional.etag_matches(request, validators):
+            return conditional.not_modified(validators)
+    columns = bookings.booking_field_columns(names) if names else None
+    booking = await db.run(bookings.get_booking, booking_id, columns)
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
+    headers = conditional.item_validators("booking", booking).headers()
+    if names:
+        return Response(sparse_item_json(booking, BookingOut, names), media_type="application/json", headers=headers)
+    response.headers.update(headers)
     return booking
 
 @router.put("/update/{booking_id}", response_model=BookingOut)
-def update(booking_id: int, updated: BookingUpdate, db: Session = Depends(get_db)):
-    return bookings.update_booking(db, booking_id, updated)
+async def update(booking_id: int, updated: BookingUpdate, db: Database = Depends(get_database)):
+    return await db.run(bookings.update_booking, booking_id, updated)
 
 @router.delete("/delete/{booking_id}")
-def delete(booking_id: int, db: Session = Depends(get_db)):
-    bookings.delete_booking(db, booking_id)
+async def delete(booking_id: int, db: Database = Depends(get_database)):
+    await db.run(bookings.delete_booking, booking_id)
     return {"message": "Booking deleted"}
 
 
 
 
 
-@router.get("/user/{user_id}", response_model=list[BookingOut])
-def get_bookings_by_user(user_id: int, db: Session = Depends(get_db)):
-    return bookings.get_bookings_by_user(db, user_id)
+@router.get("/user/{user_id}", response_model=Page[BookingOut])
+async def get_bookings_by_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    expand: Literal["travel"] | None = Query(None, description="travel: embed each booking's travel"),
+    db: Database = Depends(get_read_database),
+):
+    """
+    Lists a user's bookings. With expand=travel, each booking carries its travel
+    (departure, image, ...; null when it was booked without one), loaded with
+    one extra query per page. Expanded pages can't be combined with `fields`
+    and have no ETag, since it would not cover the travels.
+    """
+    names = parse_fields(BookingOut, fields)
+    if expand:
+        if names:
+            raise HTTPException(status_code=400, detail="fields and expand can't be combined")
+        page = await db.run(bookings.get_bookings_by_user, user_id, limit, cursor, expand_travel=True)
+        return Response(Page[BookingWithTravel].model_validate(page).model_dump_json(),
+                        media_type="application/json")
+    if conditional.is_conditional(request):
+        validators = await db.run(bookings.get_bookings_by_user_validators, user_id, limit, cursor)
+        if conditional.etag_matches(request, validators):
+            return conditional.not_modified(validators)
+    if names:
+        columns = bookings.booking_field_columns(names)
+        page = await db.run(bookings.get_bookings_by_user, user_id, limit, cursor, columns)
+        return Response(sparse_page_json(page, BookingOut, names), media_type="application/json",
+                        headers=_page_headers(page))
+    if FAST_SERIALIZATION:
+        page = await db.run(bookings.get_bookings_by_user, user_id, limit, cursor, bookings.BOOKING_OUT_COLUMNS)
+        return FastJSONResponse(page_content(page), headers=_page_headers(page))
+    page = await db.run(bookings.get_bookings_by_user, user_id, limit, cursor)
+    response.headers.update(_page_headers(page))
+    return page
@@ -0,0 +1,29 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from api.database.schemas.changes import ChangePage
+from api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from api.crud import changes
+from api.database.connection import Database, get_database
+
+
+router = APIRouter()
+
+@router.get("", response_model=ChangePage)
+async def get_changes(
+    since: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    resource: Literal["travel", "booking"] | None = None,
+    db: Database = Depends(get_database),
+):
+    """
+    Travels and bookings created, updated or deleted since the `since` token
+    (omit it to start from the beginning). Each changed row appears once, with
+    its current state, or as a delete without data if it no longer exists.
+    Store `next` and pass it back as `since`; ask again right away while
+    `has_more` is true.
+
+    Reads the primary: a lagging replica could expose a later change before an
+    earlier one, and the token would move past the earlier one.
+    """
+    return await db.run(changes.get_changes, since, limit, resource)
@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse
 from api.database.schemas.contact import ContactCreate, ContactResponse
 from api.crud.contact import create_contact
-from api.database.connection import get_db
+from api.contact_queue import contact_queue
+from api.database.connection import Database, get_database
 
 
 router = APIRouter()
 
-@router.post("/", response_model=ContactResponse)
-def submit_contact(contact: ContactCreate, db: Session = Depends(get_db)):
-    return create_contact(db, contact)
+@router.post("/", response_model=ContactResponse, responses={202: {"description": "Queued (CONTACT_QUEUE mode)"}})
+async def submit_contact(contact: ContactCreate, db: Database = Depends(get_database)):
+    """
+    Saves a contact message. With CONTACT_QUEUE on, the message is queued and
+    written with the next batch: the response is 202 without an id.
+    """
+    if contact_queue.running:
+        contact_queue.submit(contact)
+        return JSONResponse({"detail": "Accepted"}, status_code=202)
+    return await db.run(create_contact, contact)
@@ -1,34 +1,190 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from api.database.schemas.travels import TravelCreate, TravelOut, TravelUpdate
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from api.database.schemas.travels import LocationSuggestion, TravelCreate, TravelOut, TravelUpdate
+from api.database.schemas.pagination import Lookup, Page
+from api.pagination import DEFAULT_PAGE_SIZE, IDS_DESCRIPTION, MAX_PAGE_SIZE
 from api.crud import travels
-from api.database.connection import get_db
+from api.bulk import MAX_BATCH_SIZE, ingest
+from api.config import BULK_BATCH_SIZE, FAST_SERIALIZATION, STREAM_MAX_TRAVELS
+from api.serialization import (
+    FIELDS_DESCRIPTION, FastJSONResponse, lookup_content, page_content, parse_fields, sparse_lookup_json,
+    sparse_page_json,
+)
+from api.events import stream_changes, travel_events
+from api.locations import location_index
+from api import conditional
+from api.database.connection import Database, get_database, get_read_database
 
 router = APIRouter()
 
 @router.post("/post", response_model=TravelOut)
-def create(travel: TravelCreate, db: Session = Depends(get_db)):
-    return travels.create_travel(db, travel)
+async def create(travel: TravelCreate, db: Database = Depends(get_database)):
+    return await db.run(travels.create_travel, travel)
+
+@router.post("/bulk")
+async def bulk_create(
+    request: Request,
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=MAX_BATCH_SIZE),
+    db: Database = Depends(get_database),
+):
+    """
+    Streams an NDJSON (default) or CSV (Content-Type: text/csv) body of TravelCreate
+    rows into the database in batches, and reports the rows that were rejected.
+    """
+    return await ingest(request, db, TravelCreate, travels.bulk_create_travels, batch_size)
+
+@router.get("/get", response_model=Page[TravelOut])
+async def get_all(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    departs_after: datetime | None = None,
+    departs_before: datetime | None = None,
+    order_by: Literal["id", "departure_at"] = "id",
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: Database = Depends(get_read_database),
+):
+    """
+    Lists travels, optionally only those departing in [departs_after, departs_before),
+    ordered by id or by departure time (travels without a departure_at are left
+    out of the departure ordering).
+
+    Responses carry an ETag; a request whose If-None-Match still matches gets a
+    304, checked with an aggregate query when the page isn't cached.
+    """
+    names = parse_fields(TravelOut, fields)
+    filters = (departs_after, departs_before, order_by)
+    # Served as pre-serialized JSON from the catalog cache
+    representation = travels.cached_travels_json(limit, cursor, *filters, names)
+    if representation is None:
+        if conditional.is_conditional(request):
+            validators = await db.run(travels.get_travels_validators, limit, cursor, *filters)
+            if conditional.etag_matches(request, validators):
+                return conditional.not_modified(validators)
+        representation = await db.run(travels.get_travels_json, limit, cursor, *filters, names)
+    return conditional.respond(request, representation)
+
+@router.get("/search", response_model=Page[TravelOut])
+async def search(
+    from_location: str | None = None,
+    to_location: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: Database = Depends(get_read_database),
+):
+    """
+    Lists the travels from and/or to the given locations (exact names, as returned
+    by /locations/autocomplete).
+    """
+    if from_location is None and to_location is None:
+        raise HTTPException(status_code=400, detail="Provide from_location and/or to_location")
+    names = parse_fields(TravelOut, fields)
+    if names:
+        page = await db.run(travels.search_travels, from_location, to_location, limit, cursor,
+                            travels.travel_field_columns(names))
+        return Response(sparse_page_json(page, TravelOut, names), media_type="application/json")
+    if FAST_SERIALIZATION:
+        page = await db.run(travels.search_travels, from_location, to_location, limit, cursor,
+                            travels.TRAVEL_OUT_COLUMNS)
+        return FastJSONResponse(page_content(page))
+    return await db.run(travels.search_travels, from_location, to_location, limit, cursor)
+
+@router.get("/stream")
+async def stream(
+    ids: list[int] = Query(..., description="Travel ids to watch (repeat the parameter: ids=1&ids=2)"),
+    db: Database = Depends(get_database),
+):
+    """
+    Server-Sent Events stream of the seats and price of the given travels, to
+    replace polling /travels/get.
+
+    Starts with a `snapshot` event per existing travel, then sends a `travel`
+    event ({"id", "seats", "price"}) whenever seats are booked or the travel is
+    updated, and a `deleted` event ({"id"}) when it is deleted. Slow clients get
+    the latest values only, not every intermediate change.
+    """
+    travel_ids = set(ids)
+    if len(travel_ids) > STREAM_MAX_TRAVELS:
+        raise HTTPException(status_code=400, detail=f"At most {STREAM_MAX_TRAVELS} travels per stream")
+    # Subscribe before reading the snapshot, so no change committed in between is missed.
+    # The snapshot comes from the primary, like the changes.
+    subscription = travel_events.subscribe(travel_ids)
+    try:
+        snapshot = await db.run(travels.get_seats, travel_ids)
+    except BaseException:
+        travel_events.unsubscribe(subscription)
+        raise
+    return StreamingResponse(
+        stream_changes(subscription, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/locations/autocomplete", response_model=list[LocationSuggestion])
+async def autocomplete(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    db: Database = Depends(get_read_database),
+):
+    """
+    Suggests known locations starting with `q`, most booked first, from an
+    in-memory index (loaded from the database on the first request).
+    """
+    if not location_index.ready:
+        await db.run(location_index.build)
+    return location_index.suggest(q, limit)
 
-@router.get("/get", response_model=list[TravelOut])
-def get_all(db: Session = Depends(get_db)):
-    return travels.get_travels(db)
+@router.get("/get_many", response_model=Lookup[TravelOut])
+async def get_many(
+    ids: list[int] = Query(..., description=IDS_DESCRIPTION),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: Database = Depends(get_read_database),
+):
+    """
+    Looks up several travels (e.g. those of a booking history) with one query,
+    instead of one /get_by_id request each. Returns them keyed by id; ids that
+    don't exist are listed in `missing`.
+    """
+    names = parse_fields(TravelOut, fields)
+    if names:
+        result = await db.run(travels.get_travels_by_ids, ids, travels.travel_field_columns(names))
+        return Response(sparse_lookup_json(result, TravelOut, names), media_type="application/json")
+    if FAST_SERIALIZATION:
+        result = await db.run(travels.get_travels_by_ids, ids, travels.TRAVEL_OUT_COLUMNS)
+        return FastJSONResponse(lookup_content(result))
+    return await db.run(travels.get_travels_by_ids, ids)
 
 @router.get("/get_by_id/{travel_id}", response_model=TravelOut)
-def get(travel_id: int, db: Session = Depends(get_db)):
-    travel = travels.get_travel(db, travel_id)
-    if not travel:
+async def get(
+    travel_id: int,
+    request: Request,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: Database = Depends(get_read_database),
+):
+    names = parse_fields(TravelOut, fields)
+    representation = travels.cached_travel_json(travel_id, names)
+    if representation is None:
+        if conditional.is_conditional(request):
+            validators = await db.run(travels.get_travel_validators, travel_id)
+            if validators is not None and conditional.etag_matches(request, validators):
+                return conditional.not_modified(validators)
+        representation = await db.run(travels.get_travel_json, travel_id, names)
+    if representation is None:
         raise HTTPException(status_code=404, detail="Travel not found")
-    return travel
+    return conditional.respond(request, representation)
 
     
 @router.put("/update/{travel_id}", response_model=TravelOut)
-def update_seats(travel_id: int, updated: TravelUpdate, db: Session = Depends(get_db)):
-    return travels.update_travel(db, travel_id, updated)
+async def update_seats(travel_id: int, updated: TravelUpdate, db: Database = Depends(get_database)):
+    return await db.run(travels.update_travel, travel_id, updated)
 
 
 @router.delete("/delete/{travel_id}")
-def delete(travel_id: int, db: Session = Depends(get_db)):
-    travels.delete_travel(db, travel_id)
+async def delete(travel_id: int, db: Database = Depends(get_database)):
+    await db.run(travels.delete_travel, travel_id)
     return {"message": "Travel deleted"}
 
@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from api.database.schemas.user import UserResponse, UserUpdate
+from api.database.schemas.pagination import Lookup, Page
+from api.pagination import DEFAULT_PAGE_SIZE, IDS_DESCRIPTION, MAX_PAGE_SIZE
 from api.token import get_current_user
 from api.crud import user as user_crud
-from api.database.connection import get_db
+from api.database.connection import Database, get_database, get_read_database
+from api.security import hash_password_async
+from api.config import FAST_SERIALIZATION
+from api.serialization import (
+    FIELDS_DESCRIPTION, FastJSONResponse, lookup_content, page_content, parse_fields, sparse_lookup_json,
+    sparse_page_json,
+)
 
 # Create an instance of the APIRouter to define route group for users
 router = APIRouter()
@@ -14,7 +21,7 @@ router = APIRouter()
 # Auth Required: Yes (Depends on get_current_user)
 # ----------------------------------------------------------
 @router.get("/profile", response_model=UserResponse)
-def get_profile(current_user: UserResponse = Depends(get_current_user)):
+async def get_profile(current_user: UserResponse = Depends(get_current_user)):
     """
     Fetch the profile details of the currently authenticated user.
     Uses token-based authentication to get user info.
@@ -24,29 +31,38 @@ def get_profile(current_user: UserResponse = Depends(get_current_user)):
 
 # ----------------------------------------------------------
 # Route: GET /users
-# Description: Returns all users or a specific user by ID
-# Query Param: user_id (optional)
+# Description: Returns a page of users or a specific user by ID
+# Query Params: user_id (optional), limit, cursor
 # ----------------------------------------------------------
-@router.get("/users", response_model=list[UserResponse])
-def read_users(
+@router.get("/users", response_model=Page[UserResponse])
+async def read_users(
     user_id: int = None, 
-    db: Session = Depends(get_db)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: Database = Depends(get_read_database)
 ):
     """
-    Fetch all users from the database or a single user if 'user_id' is provided.
-    Returns a list of UserResponse models.
+    Fetch a page of users from the database or a single user if 'user_id' is provided.
+    Returns a Page of UserResponse models.
     
     Args:
         user_id (int, optional): ID of the specific user to fetch.
-        db (Session): SQLAlchemy DB session dependency.
+        limit (int): Maximum number of users in the page.
+        cursor (str, optional): 'next_cursor' from the previous page.
+        fields (str, optional): Comma-separated UserResponse fields to return (default: all).
+        db (Database): Database handle dependency.
     
     Raises:
-        HTTPException: If user_id is provided and no user is found.
+        HTTPException: If user_id is provided and no user is found, or (400) if fields has unknown names.
     
     Returns:
-        list[UserResponse]: List of users or a single user inside a list.
+        Page[UserResponse]: A page of users, or a single user inside a page.
     """
-    result = user_crud.get_users(db, user_id)
+    # Only the response columns (or the requested fields) are selected, never the password hash
+    names = parse_fields(UserResponse, fields)
+    columns = user_crud.user_field_columns(names) if names else user_crud.USER_RESPONSE_COLUMNS
+    result = await db.run(user_crud.get_users, user_id, limit, cursor, columns)
     
     # If user_id is provided but no user found, raise 404
     if user_id and not result:
@@ -55,8 +71,47 @@ def read_users(
             detail="User not found"
         )
     
-    # If result is a list, return it, otherwise wrap single result in a list
-    return result if isinstance(result, list) else [result]
+    # A single user is wrapped in a one-item page
+    page = result if not user_id else {"items": [result], "next_cursor": None}
+    if names:
+        return Response(sparse_page_json(page, UserResponse, names), media_type="application/json")
+    # The fast path skips response_model validation
+    return FastJSONResponse(page_content(page)) if FAST_SERIALIZATION else page
+
+
+# ----------------------------------------------------------
+# Route: GET /get_many
+# Description: Returns several users by ID in one request
+# Query Params: ids (repeated), fields
+# ----------------------------------------------------------
+@router.get("/get_many", response_model=Lookup[UserResponse])
+async def read_users_by_ids(
+    ids: list[int] = Query(..., description=IDS_DESCRIPTION),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: Database = Depends(get_read_database)
+):
+    """
+    Fetch several users at once, with a single query instead of one
+    /users?user_id= request per user.
+    
+    Args:
+        ids (list[int]): IDs of the users to fetch (repeat the parameter).
+        fields (str, optional): Comma-separated UserResponse fields to return (default: all).
+        db (Database): Database handle dependency.
+    
+    Raises:
+        HTTPException: (400) If there are too many ids, or fields has unknown names.
+    
+    Returns:
+        Lookup[UserResponse]: Found users keyed by ID, and the IDs with no user in `missing`.
+    """
+    # Like /users, never select the password hash
+    names = parse_fields(UserResponse, fields)
+    columns = user_crud.user_field_columns(names) if names else user_crud.USER_RESPONSE_COLUMNS
+    result = await db.run(user_crud.get_users_by_ids, ids, columns)
+    if names:
+        return Response(sparse_lookup_json(result, UserResponse, names), media_type="application/json")
+    return FastJSONResponse(lookup_content(result)) if FAST_SERIALIZATION else result
 
 
 # ----------------------------------------------------------
@@ -64,10 +119,10 @@ def read_users(
 # Description: Updates user details based on the given user_id
 # ----------------------------------------------------------
 @router.put("/update/{user_id}", response_model=UserResponse)
-def update_user(
+async def update_user(
     user_id: int, 
     user: UserUpdate, 
-    db: Session = Depends(get_db)
+    db: Database = Depends(get_database)
 ):
     """
     Update a user’s information in the database using their user_id.
@@ -75,7 +130,7 @@ def update_user(
     Args:
         user_id (int): The ID of the user to update.
         user (UserUpdate): Pydantic model containing updated fields.
-        db (Session): SQLAlchemy DB session.
+        db (Database): Database handle dependency.
     
     Raises:
         HTTPException: If the user with given ID does not exist.
@@ -83,7 +138,9 @@ def update_user(
     Returns:
         UserResponse: The updated user object.
     """
-    updated_user = user_crud.update_user(db, user_id, user)
+    # Hash a new password on the hashing executor, not on the event loop
+    hashed_password = await hash_password_async(user.password) if user.password else None
+    updated_user = await db.run(user_crud.update_user, user_id, user, hashed_password)
     
     # Raise 404 if user doesn't exist
     if not updated_user:
@@ -100,16 +157,16 @@ def update_user(
 # Description: Deletes the user with the given user_id
 # ----------------------------------------------------------
 @router.delete("/delete/{user_id}", response_model=UserResponse)
-def delete_user(
+async def delete_user(
     user_id: int, 
-    db: Session = Depends(get_db)
+    db: Database = Depends(get_database)
 ):
     """
     Delete a user from the database using their user_id.
     
     Args:
         user_id (int): ID of the user to delete.
-        db (Session): SQLAlchemy DB session.
+        db (Database): Database handle dependency.
     
     Raises:
         HTTPException: If the user is not found.
@@ -117,7 +174,7 @@ def delete_user(
     Returns:
         UserResponse: The deleted user’s data.
     """
-    deleted_user = user_crud.delete_user(db, user_id)
+    deleted_user = await db.run(user_crud.delete_user, user_id)
     
     # Raise 404 if no such user found
     if not deleted_user:
@@ -1,7 +1,32 @@
-from passlib.context import CryptContext
+import asyncio  # For awaiting the hashing executor from async routes
+import time  # For measuring how long hashing requests wait for a worker
+from concurrent.futures import BrokenExecutor  # Raised by a process pool whose worker died
+from functools import lru_cache
 
-# Initialize the password hashing context with bcrypt algorithm
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from fastapi import HTTPException
+
+from api.config import BCRYPT_ROUNDS, HASH_EXECUTOR, HASH_WORKERS, HASH_MAX_QUEUE
+
+
+# The password hashing context, created on first use so passlib is not imported
+# at startup (or in hashing workers before they get their first job).
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """
+    Returns the bcrypt CryptContext.
+
+    min/max rounds pin the work factor, so hashes made with any other cost are
+    reported by needs_rehash() and upgraded (or downgraded) on the next login.
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=BCRYPT_ROUNDS,
+        bcrypt__min_rounds=BCRYPT_ROUNDS,
+        bcrypt__max_rounds=BCRYPT_ROUNDS,
+    )
 
 # Function to hash a password
 def hash_password(password: str) -> str:
@@ -11,7 +36,7 @@ def hash_password(password: str) -> str:
     :param password: The plain text password to be hashed.
     :return: The hashed password as a string.
     """
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 # Function to verify a password
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -22,4 +47,133 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     :param hashed_password: The stored hashed password.
     :return: True if passwords match, False otherwise.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+# Function to check whether a stored hash uses an outdated work factor
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    Checks if a stored hash was made with settings other than the current ones.
+
+    :param hashed_password: The stored hashed password.
+    :return: True if the password should be hashed again with the current cost.
+    """
+    return get_pwd_context().needs_update(hashed_password)
+
+
+# ----------------------------------------------------------------------------
+# Hashing executor
+# bcrypt costs 100-300 ms of CPU per call. The async variants below run it on a
+# dedicated, bounded executor so it never blocks the event loop or the request
+# threadpool. At most HASH_WORKERS hashes run at once, up to HASH_MAX_QUEUE more
+# wait for a worker, and anything beyond that is rejected with 503.
+# ----------------------------------------------------------------------------
+_executor = None
+_semaphore = None
+hash_stats = {
+    "queued": 0,  # Requests waiting for a worker
+    "running": 0,  # Hashes being computed
+    "completed": 0,  # Hashes finished (including failures)
+    "rejected": 0,  # Requests turned away because the queue was full
+    "wait_seconds_total": 0.0,  # Total time spent waiting for a worker
+}
+
+
+def _get_executor():
+    """
+    Creates the hashing executor on first use.
+    """
+    global _executor
+    if _executor is None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        if HASH_EXECUTOR == "process":
+            # "spawn" keeps the workers independent of the server's threads and sockets
+            _executor = ProcessPoolExecutor(
+                max_workers=HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            _executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+    return _executor
+
+
+async def _run_hashing(fn, *args):
+    """
+    Runs a hashing function on the executor, respecting the concurrency cap.
+    """
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(HASH_WORKERS)
+
+    if hash_stats["queued"] >= HASH_MAX_QUEUE:
+        hash_stats["rejected"] += 1
+        raise HTTPException(status_code=503, detail="Server busy, try again", headers={"Retry-After": "1"})
+
+    hash_stats["queued"] += 1
+    waiting = True
+    enqueued_at = time.monotonic()
+    try:
+        async with _semaphore:
+            hash_stats["queued"] -= 1
+            waiting = False
+            hash_stats["wait_seconds_total"] += time.monotonic() - enqueued_at
+            hash_stats["running"] += 1
+            loop = asyncio.get_running_loop()
+            executor = _get_executor()
+            try:
+                return await loop.run_in_executor(executor, fn, *args)
+            except BrokenExecutor:
+                # A worker process died (e.g. OOM-killed), which breaks the whole pool.
+                # Replace it once, unless a concurrent request already did
+                _discard_executor(executor)
+                return await loop.run_in_executor(_get_executor(), fn, *args)
+            finally:
+                hash_stats["running"] -= 1
+                hash_stats["completed"] += 1
+    finally:
+        if waiting:
+            hash_stats["queued"] -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Same as hash_password, but computed on the hashing executor.
+
+    :param password: The plain text password to be hashed.
+    :return: The hashed password as a string.
+    """
+    return await _run_hashing(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Same as verify_password, but computed on the hashing executor.
+
+    :param plain_password: The plain text password input by the user.
+    :param hashed_password: The stored hashed password.
+    :return: True if passwords match, False otherwise.
+    """
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+def _discard_executor(executor):
+    """
+    Shuts `executor` down and forgets it if it is still the current one.
+    """
+    global _executor
+    if _executor is executor:
+        _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def stop_hashing():
+    """
+    Shuts the hashing executor down (it and the concurrency cap are recreated on
+    the next use, e.g. by another event loop).
+    """
+    global _semaphore
+    if _executor is not None:
+        _discard_executor(_executor)
+    # The semaphore is bound to the event loop that used it
+    _semaphore = None
@@ -0,0 +1,156 @@
+from functools import lru_cache
+from typing import Any
+
+from fastapi import HTTPException, Response
+from pydantic import ConfigDict, TypeAdapter, create_model
+
+from api.config import FAST_SERIALIZATION
+from api.database.schemas.pagination import Lookup, Page
+
+try:  # orjson is optional; Pydantic's serializer is used when it is missing
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Precompiled serializer for plain Python data (dicts, lists, datetimes, ...).
+# Serializing through it does not validate anything.
+_any_adapter = TypeAdapter(Any)
+
+
+def dumps(content) -> bytes:
+    """
+    Encodes plain Python data to JSON bytes with orjson, or Pydantic's serializer.
+
+    Both produce the same output as the regular response_model path for our
+    schemas (ISO 8601 datetimes, floats as-is).
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return _any_adapter.dump_json(content)
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response that encodes its content with `dumps` instead of the stdlib json
+    encoder. Use it for content that is already plain data.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def schema_columns(model, schema) -> list:
+    """
+    Returns the model columns backing each field of a response schema, in the
+    schema's field order, so `db.query(*columns)` returns exactly what the
+    schema would serialize (and nothing else, e.g. no password hash).
+
+    :param model: SQLAlchemy model, e.g. Travel.
+    :param schema: Pydantic response schema, e.g. TravelOut.
+    :return: List of model columns.
+    """
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def page_content(page: dict) -> dict:
+    """
+    Turns a page of SQL rows (as returned by api.pagination.paginate for a column
+    query) into plain data ready for `dumps` / FastJSONResponse.
+    """
+    return {"items": [row._asdict() for row in page["items"]], "next_cursor": page["next_cursor"]}
+
+
+def lookup_content(result: dict) -> dict:
+    """
+    Turns the SQL rows found by api.pagination.lookup into plain data ready for
+    `dumps` / FastJSONResponse (JSON object keys are strings).
+    """
+    return {"items": {str(row_id): row._asdict() for row_id, row in result["items"].items()},
+            "missing": result["missing"]}
+
+
+# ----- Sparse fieldsets -----
+# List and get endpoints accept `fields=name,other` to return only some fields of
+# their schema. Only the matching columns are selected, so unneeded (or large)
+# columns never leave the database.
+
+# OpenAPI description of the `fields` query parameter
+FIELDS_DESCRIPTION = "Comma-separated fields to return, e.g. id,name (default: all fields)"
+
+def parse_fields(schema, fields: str | None) -> tuple | None:
+    """
+    Parses and validates a comma-separated `fields` query parameter.
+
+    :param schema: Response schema the fields are chosen from, e.g. TravelOut.
+    :param fields: Raw parameter value, or None when it wasn't given.
+    :return: Field names in the requested order (duplicates removed), or None for all fields.
+    :raises HTTPException: 400 if a field is empty or not part of the schema.
+    """
+    if fields is None:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",")))
+    unknown = [name for name in names if name not in schema.model_fields]
+    if unknown or not all(names):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown) or '(empty)'}. Available: {', '.join(schema.model_fields)}",
+        )
+    return names
+
+
+def field_columns(model, names: tuple, required: tuple = ()) -> list:
+    """
+    Returns the model columns to select for a sparse fieldset.
+
+    :param model: SQLAlchemy model, e.g. Travel.
+    :param names: Field names returned by `parse_fields`.
+    :param required: Columns needed besides the fields, e.g. the pagination keys.
+    :return: List of model columns.
+    """
+    columns = [getattr(model, name) for name in names]
+    return columns + [column for column in required if column.key not in names]
+
+
+@lru_cache(maxsize=None)
+def sparse_model(schema, names: tuple):
+    """
+    Builds (once per field set) a response model with only `names` of `schema`'s fields.
+    """
+    fields = {name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in names}
+    return create_model(f"{schema.__name__}Fields", __config__=ConfigDict(from_attributes=True), **fields)
+
+
+def sparse_item_json(row, schema, names: tuple) -> bytes:
+    """
+    Serializes the `names` fields of one SQL row (validated through the trimmed
+    model unless FAST_SERIALIZATION is on).
+    """
+    content = {name: getattr(row, name) for name in names}
+    if FAST_SERIALIZATION:
+        return dumps(content)
+    return sparse_model(schema, names).model_validate(content).model_dump_json().encode()
+
+
+def sparse_page_json(page: dict, schema, names: tuple) -> bytes:
+    """
+    Serializes the `names` fields of a page of SQL rows returned by paginate.
+    """
+    content = {"items": [{name: getattr(row, name) for name in names} for row in page["items"]],
+               "next_cursor": page["next_cursor"]}
+    if FAST_SERIALIZATION:
+        return dumps(content)
+    return Page[sparse_model(schema, names)].model_validate(content).model_dump_json().encode()
+
+
+def sparse_lookup_json(result: dict, schema, names: tuple) -> bytes:
+    """
+    Serializes the `names` fields of the SQL rows found by api.pagination.lookup.
+    """
+    content = {"items": {str(row_id): {name: getattr(row, name) for name in names}
+                         for row_id, row in result["items"].items()},
+               "missing": result["missing"]}
+    if FAST_SERIALIZATION:
+        return dumps(content)
+    return Lookup[sparse_model(schema, names)].model_validate(content).model_dump_json().encode()
@@ -1,11 +1,11 @@
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from api.config import SECRET_KEY, ALGORITHM
+from api.cache import principal_cache
 from api.crud.user import get_user_by_email
-from api.database.connection import get_db
-from sqlalchemy.orm import Session
+from api.database.connection import Database, get_database
+from api.database.schemas.user import UserResponse
 
 # Define the OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -19,20 +19,26 @@ def create_access_token(data: dict, expires_delta: timedelta = timedelta(60 * 24
     :param expires_delta: Time duration for which the token remains valid (default is 30 minutes).
     :return: Encoded JWT token.
     """
+    from jose import jwt  # imported on first use: python-jose pulls in cryptography
+
     to_encode = data.copy()
     expire = datetime.utcnow() + expires_delta
     to_encode.update({"exp": expire})  # Add expiration time to the token payload
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 # Function to retrieve the currently authenticated user
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Database = Depends(get_database)):
     """
     Decodes the JWT token to extract user information and validate authentication.
+    The user is served from the principal cache when possible, so most requests
+    skip the database lookup.
     
     :param token: JWT token retrieved from the request header.
-    :param db: Database session dependency.
-    :return: Authenticated user object.
+    :param db: Database handle dependency.
+    :return: Authenticated user (UserResponse).
     """
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(status_code=401, detail="Could not validate credentials")
     try:
         # Decode the JWT token
@@ -43,8 +49,21 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception  # Handle invalid token errors
     
+    # Serve the principal from the cache when it is there
+    user = principal_cache.get(email)
+    if user is not None:
+        return user
+
+    # Captured before the read: if update_user / delete_user invalidates the cache
+    # while the query runs, the snapshot below may predate their commit
+    generation = principal_cache.generation
+
     # Fetch user details from the database
-    user = get_user_by_email(db, email)
-    if user is None:
+    db_user = await db.run(get_user_by_email, email)
+    if db_user is None:
         raise credentials_exception  # Raise exception if user not found
+
+    # Cache a snapshot without the password hash, unless a user write happened meanwhile
+    user = UserResponse.model_validate(db_user)
+    principal_cache.set(email, user, generation=generation)
     return user
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Compares the sync (threadpool) and async (DB_ASYNC=true) database paths.
+
+Each mode runs in its own interpreter, because the engine is picked from the
+environment when api.database.connection is imported. The FastAPI app is
+driven in-process through httpx's ASGI transport against a seeded SQLite file,
+with the same number of concurrent clients for both modes.
+
+Usage:
+    python -m benchmarks.async_vs_sync --requests 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import bench_env, seed, summarize
+
+
+async def drive(total: int, concurrency: int, travels: int) -> dict:
+    """Fires `total` GET /travels/get_by_id requests with `concurrency` workers."""
+    import httpx
+
+    from api.main import app
+
+    latencies = []
+    counter = iter(range(total))
+
+    async def worker(client):
+        for i in counter:
+            started = time.perf_counter()
+            response = await client.get(f"/travels/get_by_id/{i % travels + 1}")
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "throughput_rps": round(total / elapsed, 1),
+        **summarize(latencies),
+    }
+
+
+def run_mode(args) -> dict:
+    """Entry point of the child interpreter for a single mode."""
+    seed(travels=args.travels)
+    return asyncio.run(drive(args.requests, args.concurrency, args.travels))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--travels", type=int, default=1000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args)))
+        return
+
+    results = {}
+    for mode, flag in (("sync", "false"), ("async", "true")):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = bench_env(tmp, DB_ASYNC=flag)
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.async_vs_sync", "--child",
+                 "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+                 "--travels", str(args.travels)],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:>5}: {results[mode]}")
+
+
+if __name__ == "__main__":
+    main()
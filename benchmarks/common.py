@@ -0,0 +1,100 @@
+"""
+Helpers shared by the benchmarks: environment setup, seeding and latency stats.
+
+The api package reads its settings at import time, so `bench_env` must be
+applied to os.environ (or a child interpreter's environment) before anything
+from api is imported; the other helpers import api lazily for that reason.
+"""
+import os
+import re
+import statistics
+
+# Password of every seeded user
+SEED_PASSWORD = "bench-password"
+
+
+def bench_env(directory: str, **overrides) -> dict:
+    """
+    Returns the environment for running the app against a fresh SQLite file in
+    `directory`, on top of the current environment.
+
+    :param directory: Directory for the database file (e.g. a TemporaryDirectory).
+    :param overrides: Extra variables, e.g. DB_ASYNC="true".
+    """
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{directory}/bench.db",
+        SECRET_KEY=os.getenv("SECRET_KEY", "bench"),
+        ALGORITHM=os.getenv("ALGORITHM", "HS256"),
+        **overrides,
+    )
+    env.pop("ASYNC_DATABASE_URL", None)
+    return env
+
+
+def seed(users: int = 0, travels: int = 0, bookings: int = 0, seats: int = 40, password_hash: str | None = None):
+    """
+    Creates the schema and inserts users, travels and bookings with executemany.
+
+    Users are user{i}@example.com / SEED_PASSWORD when `password_hash` is given
+    (hash it once with api.security.hash_password), otherwise they get a dummy
+    hash and can't log in. Bookings are spread round-robin over the users and
+    travels (and reference their travel through travel_id).
+    """
+    from datetime import datetime, timedelta
+    from sqlalchemy import insert
+
+    from api.database.base import Base
+    from api.database.connection import engine
+    from api.database.models.bookings import Booking
+    from api.database.models.travels import Travel
+    from api.database.models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        if users:
+            conn.execute(insert(User), [
+                {"name": f"User {i}", "email": f"user{i}@example.com", "password": password_hash or "x" * 60,
+                 "mob_number": f"{i:010d}", "role": "customer", "created_at": now}
+                for i in range(users)
+            ])
+        if travels:
+            conn.execute(insert(Travel), [
+                {"image": f"https://img.example.com/{i}.jpg", "from_location": f"City {i % 50}",
+                 "to_location": f"City {(i * 7) % 50}", "time": "08:00",
+                 "departure_at": now + timedelta(hours=i % 720), "seats": seats, "price": 10.0 + i % 30,
+                 "created_at": now, "updated_at": now}
+                for i in range(travels)
+            ])
+        if bookings:
+            conn.execute(insert(Booking), [
+                {"user_id": i % users + 1, "travel_id": i % travels + 1 if travels else None,
+                 "from_location": f"City {i % 50}", "to_location": f"City {(i * 7) % 50}", "seats": 2,
+                 "price_per_seat": 12.5, "total_price": 25.0, "created_at": now, "updated_at": now}
+                for i in range(bookings)
+            ])
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    return samples[max(0, min(len(samples) - 1, round(fraction * len(samples)) - 1))]
+
+
+def summarize(latencies: list[float]) -> dict:
+    """p50/p95/p99 in milliseconds of a list of latencies in seconds."""
+    latencies = sorted(latencies)
+    return {
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+_STATEMENTS = re.compile(r'db;[^,]*desc="(\d+) statements"')
+
+
+def sql_statements(response) -> int | None:
+    """Number of SQL statements reported by the Server-Timing header of a response."""
+    match = _STATEMENTS.search(response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else None
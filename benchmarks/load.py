@@ -0,0 +1,194 @@
+"""
+Load test driving realistic request mixes against the app in-process.
+
+The FastAPI app from api/main.py is served through httpx's ASGI transport (no
+network, no server process) against a freshly seeded SQLite file. Concurrent
+virtual users each log in once, then pick requests from a weighted mix:
+browsing the catalog, logging in, reading their profile, booking a seat and
+listing their booking history.
+
+For every endpoint it reports p50/p95/p99 latency, throughput and the average
+number of SQL statements per request (read from the Server-Timing header). The
+results are written as JSON, so runs on two commits can be diffed or compared
+with --compare.
+
+Usage:
+    python -m benchmarks.load --requests 5000 --concurrency 32 --output before.json
+    python -m benchmarks.load --mix read --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+from benchmarks.common import SEED_PASSWORD, bench_env, seed, sql_statements, summarize
+
+# Relative weights of the operations in each mix
+MIXES = {
+    "mixed": {"browse": 35, "travel": 10, "profile": 20, "history": 15, "book": 15, "login": 5},
+    "read": {"browse": 50, "travel": 20, "profile": 15, "history": 15},
+    "write": {"book": 70, "login": 10, "history": 20},
+}
+
+
+async def browse(client, user, rng, args):
+    return "GET /travels/get", await client.get("/travels/get", params={"limit": 20})
+
+
+async def travel(client, user, rng, args):
+    travel_id = rng.randint(1, args.travels)
+    return "GET /travels/get_by_id/{id}", await client.get(f"/travels/get_by_id/{travel_id}")
+
+
+async def login(client, user, rng, args):
+    response = await client.post("/auth/login", json={"email": user["email"], "password": SEED_PASSWORD})
+    if response.status_code == 200:
+        user["headers"] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return "POST /auth/login", response
+
+
+async def profile(client, user, rng, args):
+    return "GET /users/profile", await client.get("/users/profile", headers=user["headers"])
+
+
+async def history(client, user, rng, args):
+    return "GET /bookings/user/{id}", await client.get(f"/bookings/user/{user['id']}", params={"limit": 20})
+
+
+async def book(client, user, rng, args):
+    return "POST /bookings/post", await client.post("/bookings/post", json={
+        "user_id": user["id"],
+        "travel_id": rng.randint(1, args.travels),
+        "from_location": "City A",
+        "to_location": "City B",
+        "seats": 1,
+        "price_per_seat": 10.0,
+        "total_price": 10.0,
+    })
+
+
+OPERATIONS = {"browse": browse, "travel": travel, "login": login, "profile": profile, "history": history, "book": book}
+
+
+async def drive(args) -> dict:
+    """Runs the warm-up and the measured requests, and aggregates them per endpoint."""
+    import httpx
+
+    from api.main import app
+
+    names, weights = zip(*MIXES[args.mix].items())
+    samples = defaultdict(lambda: {"latencies": [], "statuses": Counter(), "statements": []})
+
+    async def user_session(client, worker: int, budget):
+        rng = random.Random(args.seed + worker)
+        user = {"id": worker % args.users + 1, "email": f"user{worker % args.users}@example.com"}
+        await login(client, user, rng, args)
+        for measured in budget:
+            operation = OPERATIONS[rng.choices(names, weights)[0]]
+            started = time.perf_counter()
+            endpoint, response = await operation(client, user, rng, args)
+            elapsed = time.perf_counter() - started
+            if measured:
+                sample = samples[endpoint]
+                sample["latencies"].append(elapsed)
+                sample["statuses"][response.status_code] += 1
+                statements = sql_statements(response)
+                if statements is not None:
+                    sample["statements"].append(statements)
+
+    # One shared iterator hands out the requests, so the total is exact whatever
+    # the relative speed of the workers; the first `warmup` ones aren't recorded
+    budget = iter([False] * args.warmup + [True] * args.requests)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(user_session(client, worker, budget) for worker in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for endpoint, sample in sorted(samples.items()):
+        statements = sample["statements"]
+        endpoints[endpoint] = {
+            "requests": len(sample["latencies"]),
+            "statuses": {str(status): count for status, count in sorted(sample["statuses"].items())},
+            **summarize(sample["latencies"]),
+            "sql_per_request": round(sum(statements) / len(statements), 2) if statements else None,
+        }
+    all_latencies = [latency for sample in samples.values() for latency in sample["latencies"]]
+    return {
+        "total": {"requests": len(all_latencies), "elapsed_s": round(elapsed, 3),
+                  "throughput_rps": round(len(all_latencies) / elapsed, 1), **summarize(all_latencies)},
+        "endpoints": endpoints,
+    }
+
+
+def metadata(args) -> dict:
+    """Describes what was measured, so results from different commits are comparable."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {name: os.environ.get(name) for name in
+                     ("DB_ASYNC", "FAST_SERIALIZATION", "BCRYPT_ROUNDS", "HASH_EXECUTOR")},
+        "args": {key: value for key, value in vars(args).items() if key != "compare"},
+    }
+
+
+def compare(result: dict, baseline: dict):
+    """Prints the per-endpoint p95 and SQL-per-request change against a baseline result."""
+    print(f"\n{'endpoint':<30} {'p95 ms (base -> now)':>24} {'sql/req (base -> now)':>24}")
+    for endpoint, now in result["endpoints"].items():
+        base = baseline["endpoints"].get(endpoint)
+        if base is None:
+            print(f"{endpoint:<30} {'new':>24}")
+            continue
+        change = (now["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100 if base["p95_ms"] else 0.0
+        print(f"{endpoint:<30} {base['p95_ms']:>9} -> {now['p95_ms']:<7} ({change:+.0f}%)"
+              f" {str(base['sql_per_request']):>10} -> {now['sql_per_request']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests")
+    parser.add_argument("--warmup", type=int, default=200, help="requests run before measuring")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent virtual users")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--travels", type=int, default=1000)
+    parser.add_argument("--bookings", type=int, default=10000, help="bookings seeded before the run")
+    parser.add_argument("--seed", type=int, default=1, help="random seed of the request mix")
+    parser.add_argument("--output", help="write the JSON result to this file")
+    parser.add_argument("--compare", help="JSON result of an earlier run to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(bench_env(tmp))
+        from api.security import hash_password
+
+        # Hash once: seeding thousands of users with bcrypt would take minutes
+        seed(args.users, args.travels, args.bookings, seats=1_000_000, password_hash=hash_password(SEED_PASSWORD))
+        result = {"meta": metadata(args), **asyncio.run(drive(args))}
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    print(text)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(result, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
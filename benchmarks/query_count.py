@@ -0,0 +1,87 @@
+"""
+Checks that list endpoints run a fixed number of SQL statements per request,
+whatever the page size, so N+1 query patterns (e.g. loading each booking's
+travel separately) are caught before they reach production.
+
+Each endpoint is requested in-process, through httpx's ASGI transport, with a
+page of 1 row and a page of --limit rows, and the statements sent to the
+database are counted. The script exits with status 1 when a count grows with
+the page size, so it can run in CI. tests/test_query_counts.py runs the same
+check for the main list endpoints as part of the test suite.
+
+Usage:
+    python -m benchmarks.query_count --limit 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+from benchmarks.common import bench_env, seed
+
+# (path, extra query parameters); "{limit}" rows are asked for through `limit` or `ids`
+ENDPOINTS = [
+    ("/bookings/user/1", {"expand": "travel"}),
+    ("/bookings/user/1", {}),
+    ("/bookings/get", {}),
+    ("/travels/get", {}),
+    ("/users/users", {}),
+    ("/travels/get_many", {}),
+    ("/bookings/get_many", {}),
+    ("/users/get_many", {}),
+]
+
+
+async def count_statements(sizes: tuple) -> dict:
+    """Returns {endpoint: [statements at each page size]}."""
+    import httpx
+    from sqlalchemy import event
+
+    from api.database import connection
+    from api.main import app
+
+    statements = []
+    engine = connection.async_engine.sync_engine if connection.async_engine is not None else connection.engine
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    counts = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path, params in ENDPOINTS:
+            label = f"{path}?{'&'.join(f'{key}={value}' for key, value in params.items())}".rstrip("?")
+            counts[label] = []
+            for size in sizes:
+                if path.endswith("/get_many"):
+                    request_params = {**params, "ids": list(range(1, size + 1))}
+                else:
+                    request_params = {**params, "limit": size}
+                del statements[:]
+                response = await client.get(path, params=request_params)
+                response.raise_for_status()
+                counts[label].append(len(statements))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limit", type=int, default=50, help="rows in the large page")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The catalog cache would hide the queries of repeated travel pages
+        os.environ.update(bench_env(tmp, CATALOG_CACHE_SIZE="0", WARM_CACHES="false"))
+        # Every user gets `limit` bookings, each on a different travel
+        seed(users=args.limit, travels=args.limit + 1, bookings=args.limit * args.limit)
+        counts = asyncio.run(count_statements((1, args.limit)))
+
+    print(json.dumps(counts, indent=2))
+    growing = [label for label, (small, large) in counts.items() if large > small]
+    if growing:
+        print(f"Statements grow with the page size (N+1): {', '.join(growing)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Fires hundreds of concurrent bookings at a single travel and checks for overselling.
+
+The FastAPI app is driven in-process through httpx's ASGI transport against a
+fresh SQLite file. Every request asks for `--seats-per-booking` seats on the
+same travel; afterwards the remaining seat count and the number of bookings are
+checked against the number of successful responses.
+
+Usage:
+    python -m benchmarks.seat_contention --bookings 500 --seats 100
+    DB_ASYNC=true python -m benchmarks.seat_contention
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.common import bench_env, percentile
+
+
+async def drive(args) -> dict:
+    import httpx
+    from sqlalchemy import func
+
+    from api.main import app
+    from api.database.connection import SessionLocal, engine
+    from api.database.base import Base
+    from api.database.models.bookings import Booking
+    from api.database.models.travels import Travel
+    from api.database.models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add(User(name="bench", email="bench@example.com", password="x", mob_number="0", role="customer"))
+        travel = Travel(image="-", from_location="A", to_location="B", time="08:00", seats=args.seats, price=10.0)
+        db.add(travel)
+        db.commit()
+        travel_id, user_id = travel.id, 1
+
+    payload = {
+        "user_id": user_id,
+        "travel_id": travel_id,
+        "from_location": "A",
+        "to_location": "B",
+        "seats": args.seats_per_booking,
+        "price_per_seat": 10.0,
+        "total_price": 10.0 * args.seats_per_booking,
+    }
+    statuses = Counter()
+    latencies = []
+
+    async def book(client):
+        started = time.perf_counter()
+        response = await client.post("/bookings/post", json=payload)
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(book(client) for _ in range(args.bookings)))
+        elapsed = time.perf_counter() - started
+
+    with SessionLocal() as db:
+        remaining = db.get(Travel, travel_id).seats
+        booked = db.query(func.count(Booking.id)).scalar()
+
+    latencies.sort()
+    return {
+        "bookings_attempted": args.bookings,
+        "statuses": dict(statuses),
+        "seats_remaining": remaining,
+        "bookings_stored": booked,
+        "oversold": remaining < 0 or booked * args.seats_per_booking > args.seats,
+        "consistent": booked == statuses[200] and remaining == args.seats - booked * args.seats_per_booking,
+        "elapsed_s": round(elapsed, 3),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=500, help="concurrent booking requests")
+    parser.add_argument("--seats", type=int, default=100, help="seats on the travel")
+    parser.add_argument("--seats-per-booking", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(bench_env(tmp))
+        result = asyncio.run(drive(args))
+
+    for key, value in result.items():
+        print(f"{key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compares the regular list serialization with FAST_SERIALIZATION=true.
+
+Each mode runs in its own interpreter (the flag is read at import time) against
+the same seeded SQLite file, driving the list endpoints in-process through
+httpx's ASGI transport with large pages. Two numbers are reported per endpoint:
+the time to build the response body alone (ORM objects + response_model
+validation vs. column rows + orjson), and the end-to-end request latency.
+
+Usage:
+    python -m benchmarks.serialization --rows 5000 --limit 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import bench_env, seed
+
+ENDPOINTS = ["/bookings/get", "/users/users"]
+
+
+def time_body(limit: int, rounds: int) -> dict:
+    """Times building the /bookings/get response body without any HTTP."""
+    from api.crud.bookings import BOOKING_OUT_COLUMNS, get_bookings
+    from api.database.connection import SessionLocal
+    from api.database.schemas.bookings import BookingOut
+    from api.database.schemas.pagination import Page
+    from api.serialization import dumps, page_content
+
+    def regular(db):
+        return Page[BookingOut].model_validate(get_bookings(db, limit)).model_dump_json()
+
+    def fast(db):
+        return dumps(page_content(get_bookings(db, limit, None, BOOKING_OUT_COLUMNS)))
+
+    timings = {}
+    for name, build in (("regular", regular), ("fast", fast)):
+        samples = []
+        for _ in range(rounds):
+            with SessionLocal() as db:
+                started = time.perf_counter()
+                build(db)
+                samples.append(time.perf_counter() - started)
+        timings[f"body_{name}_ms"] = round(statistics.median(samples) * 1000, 2)
+    return timings
+
+
+async def drive(limit: int, rounds: int) -> dict:
+    """Requests each list endpoint `rounds` times and records the latencies."""
+    import httpx
+
+    from api.main import app
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for endpoint in ENDPOINTS:
+            samples = []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                response = await client.get(endpoint, params={"limit": limit})
+                samples.append(time.perf_counter() - started)
+                response.raise_for_status()
+            results[endpoint] = {"p50_ms": round(statistics.median(samples) * 1000, 2)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = asyncio.run(drive(args.limit, args.rounds))
+        if os.environ.get("FAST_SERIALIZATION") == "false":
+            result["body"] = time_body(args.limit, args.rounds)
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(bench_env(tmp))
+        seed(users=args.rows, bookings=args.rows)
+        for mode, flag in (("regular", "false"), ("fast", "true")):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.serialization", "--child",
+                 "--limit", str(args.limit), "--rounds", str(args.rounds)],
+                env=dict(os.environ, FAST_SERIALIZATION=flag),
+                check=True, capture_output=True, text=True,
+            ).stdout
+            print(f"{mode:>7}: {json.loads(output.strip().splitlines()[-1])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Measures how long a worker takes to start.
+
+Two numbers are tracked, each as the median of several fresh interpreters:
+- import: time to `import api.main` (module-level work and imported packages),
+- first response: time from launching `uvicorn api.main:app` until it answers
+  GET /travels/get, including interpreter start-up and the lifespan warm-up.
+
+The database is a seeded SQLite file, so it runs offline. Use --output to keep
+the JSON result for comparison with another commit.
+
+Usage:
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import http.client
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import bench_env
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import api.main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_import(env: dict) -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def time_first_response(env: dict, timeout: float = 60.0) -> float:
+    """Starts uvicorn and polls until the first successful response."""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+                conn.request("GET", "/travels/get?limit=1")
+                if conn.getresponse().status == 200:
+                    return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.005)
+            finally:
+                conn.close()
+        raise RuntimeError("the server did not answer in time")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--travels", type=int, default=1000)
+    parser.add_argument("--output", help="write the JSON result to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = bench_env(tmp)
+        # Seed in a child interpreter so this process never imports api
+        subprocess.run([sys.executable, "-c", f"from benchmarks.common import seed; seed(travels={args.travels})"],
+                       env=env, check=True)
+        imports = [time_import(env) for _ in range(args.runs)]
+        first_responses = [time_first_response(env) for _ in range(args.runs)]
+
+    result = {
+        "runs": args.runs,
+        "import_ms": round(statistics.median(imports) * 1000, 1),
+        "first_response_ms": round(statistics.median(first_responses) * 1000, 1),
+        "first_response_min_ms": round(min(first_responses) * 1000, 1),
+    }
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Measures how many concurrent /travels/stream subscribers one worker can hold.
+
+A single uvicorn worker is started against a seeded SQLite file. Subscribers are
+opened in steps (e.g. 250, 500, 1000, 2000 connections), all watching the same
+travel. At each step the travel's price is updated `--updates` times and every
+subscriber records when the change arrives, which gives the fan-out delivery
+latency (from sending the update to receiving the event) and the share of
+changes delivered. The worker's resident memory is read at each step.
+
+Clients run in this process over raw sockets, so on a small machine they share
+the CPU with the server: treat the numbers as a lower bound.
+
+Usage:
+    python -m benchmarks.stream_fanout --steps 250,500,1000,2000 --updates 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import bench_env, summarize
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb(pid: int) -> float:
+    """Resident memory of a process, in MiB (Linux only)."""
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    return 0.0
+
+
+class Subscriber:
+    """One SSE connection, recording the arrival time of every price it receives."""
+
+    def __init__(self, port: int, travel_id: int):
+        self.port = port
+        self.travel_id = travel_id
+        self.arrivals = {}  # price -> perf_counter() at arrival
+        self.task = None
+
+    async def connect(self):
+        reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        self.writer.write(
+            f"GET /travels/stream?ids={self.travel_id} HTTP/1.1\r\nHost: bench\r\n"
+            "Accept: text/event-stream\r\n\r\n".encode()
+        )
+        await self.writer.drain()
+        await reader.readuntil(b"\r\n\r\n")
+        # The snapshot event means the subscription is registered on the server
+        while not (await reader.readline()).startswith(b"data: "):
+            pass
+        self.task = asyncio.create_task(self.listen(reader))
+
+    async def listen(self, reader):
+        # Chunk-size lines of the chunked encoding are skipped along with the event names
+        while line := await reader.readline():
+            if line.startswith(b"data: "):
+                price = json.loads(line[6:]).get("price")
+                self.arrivals.setdefault(price, time.perf_counter())
+
+    def close(self):
+        self.task.cancel()
+        self.writer.close()
+
+
+async def drive(args, port: int, server_pid: int) -> list[dict]:
+    import httpx
+
+    results = []
+    subscribers = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+        for step in args.steps:
+            started = time.perf_counter()
+            while len(subscribers) < step:
+                batch = [Subscriber(port, 1) for _ in range(min(args.connect_batch, step - len(subscribers)))]
+                await asyncio.gather(*(subscriber.connect() for subscriber in batch))
+                subscribers += batch
+            connect_s = time.perf_counter() - started
+
+            latencies, expected, delivered = [], 0, 0
+            for update in range(args.updates):
+                price = step * 1000 + update
+                sent = time.perf_counter()
+                response = await client.put("/travels/update/1", json={"price": price})
+                response.raise_for_status()
+                deadline = time.perf_counter() + args.timeout
+                while time.perf_counter() < deadline and not all(price in s.arrivals for s in subscribers):
+                    await asyncio.sleep(0.005)
+                for subscriber in subscribers:
+                    expected += 1
+                    arrived = subscriber.arrivals.get(price)
+                    if arrived is not None:
+                        delivered += 1
+                        latencies.append(arrived - sent)
+
+            results.append({
+                "subscribers": step,
+                "connect_s": round(connect_s, 2),
+                "server_rss_mb": rss_mb(server_pid),
+                "delivered_pct": round(delivered / expected * 100, 2),
+                **summarize(latencies),
+            })
+            print(json.dumps(results[-1]), file=sys.stderr)
+    for subscriber in subscribers:
+        subscriber.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--steps", default="250,500,1000,2000",
+                        type=lambda value: [int(step) for step in value.split(",")],
+                        help="comma-separated subscriber counts to measure at")
+    parser.add_argument("--updates", type=int, default=20, help="price updates per step")
+    parser.add_argument("--connect-batch", type=int, default=100, help="connections opened concurrently")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds to wait for one change to fan out")
+    parser.add_argument("--output", help="write the JSON result to this file")
+    args = parser.parse_args()
+
+    # Every subscriber is one socket on each side (the server inherits the limit)
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = bench_env(tmp, STREAM_HEARTBEAT_SECONDS="60", STREAM_MAX_SECONDS="3600")
+        subprocess.run([sys.executable, "-c", "from benchmarks.common import seed; seed(travels=10)"],
+                       env=env, check=True)
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--log-level", "warning",
+             "--backlog", "4096"],
+            env=env,
+        )
+        try:
+            for _ in range(600):
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                    break
+                except OSError:
+                    time.sleep(0.05)
+            result = {
+                "python": sys.version.split()[0],
+                "cpus": os.cpu_count(),
+                "db_async": env.get("DB_ASYNC"),
+                "steps": asyncio.run(drive(args, port, server.pid)),
+            }
+        finally:
+            server.terminate()
+            server.wait()
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
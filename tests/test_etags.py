@@ -0,0 +1,46 @@
+"""
+Page ETags computed by the aggregate query (answering If-None-Match without
+loading rows) must equal the ones sent with the loaded page.
+"""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import Numeric, cast, func
+
+from api import pagination
+from api.conditional import loaded_page_state, page_validators
+from api.crud import travels
+from api.database.models.travels import Travel
+from api.database.schemas.travels import TravelCreate
+
+
+class DecimalSums:
+    # SUM() typed as Numeric, as MySQL drivers return it (a Decimal)
+    def __getattr__(self, name):
+        return getattr(func, name)
+
+    def sum(self, column):
+        return cast(func.sum(column), Numeric)
+
+
+@pytest.fixture(params=["int", "decimal"])
+def sums(request, monkeypatch):
+    if request.param == "decimal":
+        monkeypatch.setattr(pagination, "func", DecimalSums())
+    return request.param
+
+
+@pytest.mark.parametrize("limit", [2, 10])
+def test_page_etag_matches_loaded_page(db, sums, limit):
+    for _ in range(3):
+        travels.create_travel(db, TravelCreate(image="bus.jpg", from_location="A", to_location="B", time="08:00",
+                                               seats=10, price=12.5))
+    loaded = page_validators("travels", loaded_page_state(travels.get_travels(db, limit)))
+    assert travels.get_travels_validators(db, limit) == loaded
+
+
+def test_decimal_sums_are_simulated(db, sums):
+    travels.create_travel(db, TravelCreate(image="bus.jpg", from_location="A", to_location="B", time="08:00",
+                                           seats=10, price=12.5))
+    id_sum = db.query(pagination.func.coalesce(pagination.func.sum(Travel.id), 0)).scalar()
+    assert isinstance(id_sum, Decimal) == (sums == "decimal")
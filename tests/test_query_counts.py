@@ -0,0 +1,66 @@
+"""
+List endpoints run a fixed number of SQL statements whatever the page size, so
+N+1 patterns (e.g. loading each booking's travel on its own) fail here.
+"""
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.exc import InvalidRequestError
+
+from api.cache import catalog_cache
+from api.database.models.bookings import Booking
+from api.database.models.travels import Travel
+from api.database.models.user import User
+from api.main import app
+
+# Bookings of user 1, each on a different travel
+ROWS = 20
+NOW = datetime(2026, 1, 1)
+
+# (path, query parameters, statements per request)
+ENDPOINTS = [
+    # the page, then the travels of all its bookings in one IN query
+    ("/bookings/user/1", {"expand": "travel"}, 2),
+    ("/bookings/user/1", {}, 1),
+    ("/bookings/get", {}, 1),
+    ("/travels/get", {}, 1),
+]
+
+
+@pytest.fixture
+def client(db):
+    db.execute(insert(User), [{"name": "Ann", "email": "ann@example.com", "password": "hash",
+                               "mob_number": "0123456789", "role": "customer", "created_at": NOW}])
+    db.execute(insert(Travel), [
+        {"image": "bus.jpg", "from_location": "A", "to_location": "B", "time": "08:00", "seats": 10, "price": 12.5,
+         "created_at": NOW, "updated_at": NOW}
+        for _ in range(ROWS)
+    ])
+    db.execute(insert(Booking), [
+        {"user_id": 1, "travel_id": travel_id, "from_location": "A", "to_location": "B", "seats": 1,
+         "price_per_seat": 12.5, "total_price": 12.5, "created_at": NOW, "updated_at": NOW}
+        for travel_id in range(1, ROWS + 1)
+    ])
+    db.commit()
+    catalog_cache.clear()  # a cached travel page would run no statements at all
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path, params, expected", ENDPOINTS)
+def test_statements_do_not_grow_with_the_page(client, statements, path, params, expected):
+    counts = []
+    for limit in (1, ROWS):
+        del statements[:]
+        response = client.get(path, params={**params, "limit": limit})
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == limit
+        counts.append(len(statements))
+    assert counts == [expected, expected]
+
+
+def test_booking_travel_is_never_loaded_lazily(client, db):
+    booking = db.query(Booking).first()
+    with pytest.raises(InvalidRequestError):
+        booking.travel
@@ -0,0 +1,36 @@
+"""
+Bookings linked to a travel (booking.travel_id).
+"""
+from api.crud import bookings, travels, user
+from api.database.models.bookings import Booking
+from api.database.models.changes import Change
+from api.database.models.travels import Travel
+from api.database.schemas.bookings import BookingCreate
+from api.database.schemas.travels import TravelCreate
+from api.database.schemas.user import UserCreate
+
+
+def new_travel(db, seats):
+    return travels.create_travel(db, TravelCreate(image="bus.jpg", from_location="A", to_location="B", time="08:00",
+                                                  seats=seats, price=12.5))
+
+
+def test_deleting_a_travel_unlinks_its_bookings(db):
+    user.create_user(db, UserCreate(name="Ann", email="ann@example.com", password="secret",
+                                    mob_number="0123456789"), "hash")
+    travel_id = new_travel(db, 5).id
+    booking = bookings.create_booking(db, BookingCreate(user_id=1, from_location="A", to_location="B", seats=3,
+                                                        price_per_seat=12.5, total_price=37.5, travel_id=travel_id))
+    created_at = booking.updated_at
+
+    travels.delete_travel(db, travel_id)
+    unlinked = db.get(Booking, booking.id)
+    assert unlinked.travel_id is None
+    assert unlinked.updated_at > created_at
+    assert db.query(Change).filter_by(resource="booking", resource_id=booking.id, op="update").count() == 1
+
+    # SQLite reuses the id of the deleted travel: cancelling the old booking
+    # must not hand its seats to the new one
+    assert new_travel(db, 10).id == travel_id
+    bookings.delete_booking(db, booking.id)
+    assert db.get(Travel, travel_id).seats == 10
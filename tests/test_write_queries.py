@@ -0,0 +1,99 @@
+"""
+Statements sent to the database by each write function.
+
+With INSERT/UPDATE ... RETURNING, a write is a single statement that also reads
+the row back; the counts below add the statements the write needs besides it
+(the change log entries, the seat reservation, the locked read of the old
+booking). Without RETURNING, the fallback path pays one SELECT for the refresh
+(and one for loading the row before an update).
+"""
+from datetime import datetime
+
+import pytest
+
+from api.crud import bookings, contact, returning, travels, user
+from api.database.schemas.bookings import BookingCreate, BookingUpdate
+from api.database.schemas.contact import ContactCreate
+from api.database.schemas.travels import TravelCreate, TravelUpdate
+from api.database.schemas.user import UserCreate, UserUpdate
+
+NOW = datetime(2026, 1, 1)
+
+
+def new_user(db):
+    return user.create_user(db, UserCreate(name="Ann", email="ann@example.com", password="secret",
+                                           mob_number="0123456789"), "hash")
+
+
+def new_travel(db):
+    return travels.create_travel(db, TravelCreate(image="bus.jpg", from_location="A", to_location="B", time="08:00",
+                                                  seats=10, price=12.5))
+
+
+def new_booking(db):
+    new_user(db)
+    new_travel(db)
+    return bookings.create_booking(db, BookingCreate(user_id=1, from_location="A", to_location="B", seats=2,
+                                                     price_per_seat=12.5, total_price=25.0, travel_id=1))
+
+
+def no_rows(db):
+    pass
+
+
+def both_rows(db):
+    new_user(db)
+    new_travel(db)
+
+
+# (write, rows it needs, statements with RETURNING, statements without)
+WRITES = {
+    "create_user": (new_user, no_rows, 1, 2),
+    # + the change log entry
+    "create_travel": (new_travel, no_rows, 2, 3),
+    # + the seat reservation UPDATE and the change log entries of the booking and the travel
+    "create_booking": (
+        lambda db: bookings.create_booking(db, BookingCreate(user_id=1, from_location="A", to_location="B", seats=2,
+                                                             price_per_seat=12.5, total_price=25.0, travel_id=1)),
+        both_rows, 4, 5,
+    ),
+    "create_contact": (
+        lambda db: contact.create_contact(db, ContactCreate(name="Ann", email="ann@example.com", message="Hi")),
+        no_rows, 1, 2,
+    ),
+    # + the locked read of the old booking and the change log entry (the seats don't change)
+    "update_booking": (
+        lambda db: bookings.update_booking(db, 1, BookingUpdate(user_id=1, from_location="A", to_location="C",
+                                                                seats=2, price_per_seat=12.5, total_price=25.0,
+                                                                updated_at=NOW)),
+        new_booking, 3, 5,
+    ),
+    # + the change log entry
+    "update_travel": (lambda db: travels.update_travel(db, 1, TravelUpdate(price=15.0)), new_travel, 2, 4),
+    "update_user": (lambda db: user.update_user(db, 1, UserUpdate(name="Bob")), new_user, 1, 3),
+}
+
+
+@pytest.mark.parametrize("name", WRITES)
+@pytest.mark.parametrize("use_returning", [True, False], ids=["returning", "fallback"])
+def test_statements_per_write(name, use_returning, db, statements, monkeypatch):
+    write, setup, with_returning, without_returning = WRITES[name]
+    setup(db)
+    if not use_returning:
+        monkeypatch.setattr(returning, "supports_returning", lambda db, statement: False)
+    del statements[:]
+
+    assert write(db) is not None
+    assert len(statements) == (with_returning if use_returning else without_returning), statements
+
+
+@pytest.mark.parametrize("name", ["create_user", "create_contact", "update_user"])
+def test_write_is_one_statement(name, db, statements):
+    # Writes without side tables read the row back in the INSERT/UPDATE itself
+    write, setup, _, _ = WRITES[name]
+    setup(db)
+    del statements[:]
+
+    write(db)
+    assert len(statements) == 1
+    assert "RETURNING" in statements[0]